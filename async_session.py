@@ -0,0 +1,149 @@
+"""
+    An asyncio counterpart to the LetterboxdSession, for having many requests in flight at once.
+    It shares the login (cookies) of the regular SESSION.
+
+    Requires httpx (pip install httpx).
+
+    Example:
+        async with AsyncLetterboxdSession(max_connections=50) as session:
+            film_data = await FilmSearch(genre="horror").async_call(session)
+"""
+
+# Imports
+import asyncio
+import httpx
+
+# Local Imports
+from session import SESSION, LetterboxdSession
+from rate_limiter import get_retry_after
+from retry import is_failure
+
+
+class AsyncLetterboxdSession():
+    """ Makes requests as the user, through a pooled async client. """
+
+    def __init__(self, max_connections=20, max_keepalive_connections=10, timeout=30):
+        """
+        Parameters:
+        - max_connections (int) - the maximum number of requests in flight at once
+        - max_keepalive_connections (int) - the number of idle connections kept open for reuse
+        - timeout (int or float) - seconds to wait for a response
+        """
+        # NOTE: the cookie jar is shared with SESSION, so a login by either applies to both
+        self.client = httpx.AsyncClient(
+            base_url=SESSION.MAIN_URL,
+            headers=dict(SESSION.headers),
+            cookies=SESSION.cookies,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+            timeout=timeout,
+            follow_redirects=True
+        )
+        self.__login_lock = asyncio.Lock()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}>\nusername: {SESSION.username}\nlogged_in: {SESSION.logged_in}"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """ Close all the connections in the pool. """
+        await self.client.aclose()
+
+    async def login(self):
+        """ Login using the regular SESSION (if not already). """
+        async with self.__login_lock:
+            if not SESSION.logged_in:
+                await asyncio.to_thread(SESSION)
+
+    async def request(self, method, suburl='', login_required=None, **kwargs):
+        """
+        The async equivalent of LetterboxdSession.request()
+        Requests default to the main Letterboxd url,
+        and include the __CSRF token if it's a POST request.
+
+        Failed requests are retried and the circuit breaker is checked, as in LetterboxdSession.request()
+
+        Parameters:
+        - login_required (bool or None) - if True, the session will login first (if not already).
+            Defaults to True for POST requests, and False otherwise.
+        """
+        if login_required is None:
+            login_required = method == "POST"
+        if login_required and not SESSION.logged_in:
+            await self.login()
+
+        if method == "POST":
+            # Getting the token may require a request, so don't block the event loop
+            cookie_params = await asyncio.to_thread(lambda: SESSION.cookie_params)
+            kwargs['data'] = dict(cookie_params, **(kwargs.get('data') or {}))
+
+        if cookies := kwargs.pop('cookies', None):
+            # httpx has deprecated per-request cookies, so they are sent in the header 
+            # (which replaces the session's cookies, hence these are included too)
+            cookies = dict({c.name: c.value for c in SESSION.cookies}, **cookies)
+            cookie_header = '; '.join([f"{k}={v}" for k,v in cookies.items()])
+            kwargs['headers'] = dict(kwargs.get('headers') or {}, Cookie=cookie_header)
+
+        response = await self.__send_with_retries(method, suburl, **kwargs)
+
+        if response.is_error:
+            response.raise_for_status()
+
+        LetterboxdSession.get_html_response_dict(response)
+
+        return response
+
+    async def __send_with_retries(self, method, suburl, **kwargs):
+        """ The async equivalent of LetterboxdSession.__send_with_retries(),
+        using the SESSION's retry_policy and circuit_breaker.
+        r-type: httpx.Response """
+        retry_policy, circuit_breaker = SESSION.retry_policy, SESSION.circuit_breaker
+        retryable = retry_policy is not None and retry_policy.is_retryable(method, suburl, kwargs.get('data'))
+
+        attempt = 0
+        while True:
+            if circuit_breaker is not None:
+                circuit_breaker.before_request()
+
+            response = error = failed = None
+            try:
+                try:
+                    response = await self.__send(method, suburl, **kwargs)
+                except httpx.TransportError as e:
+                    error = e
+                failed = error is not None or is_failure(response.status_code)
+            finally:
+                # failed is still None if the request failed for a reason other than the site
+                # (e.g. it was cancelled, or the url is invalid); it's raised uncounted,
+                # but a trial request must still be cleared
+                if circuit_breaker is not None:
+                    circuit_breaker.record(failed)
+            if not failed:
+                return response
+
+            attempt += 1
+            if not retryable or attempt > retry_policy.max_retries:
+                if error:
+                    raise error
+                return response
+            retry_after = get_retry_after(response.headers.get('Retry-After')) if response is not None else None
+            await asyncio.sleep(retry_policy.get_delay(attempt, retry_after))
+
+    async def __send(self, method, suburl, **kwargs):
+        """ Sends a single request, paced by the SESSION's rate_limiter.
+        r-type: httpx.Response """
+        route_class = await SESSION.rate_limiter.async_acquire(method, suburl) if SESSION.rate_limiter is not None else None
+        response = None
+        try:
+            return (response := await self.client.request(method, suburl, **kwargs))
+        finally:
+            if route_class:
+                SESSION.rate_limiter.release(
+                    route_class,
+                    response.status_code if response is not None else None,
+                    response.headers.get('Retry-After') if response is not None else None
+                )
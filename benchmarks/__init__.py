@@ -0,0 +1,5 @@
+"""
+    Offline tools for measuring the performance of the scrapers.
+    Run these from the root of the repository, e.g.
+        python -m benchmarks.bench_parsers
+"""
@@ -0,0 +1,131 @@
+"""
+    Benchmarks the set operations on list entries (see entry_set.py), without making any requests.
+
+    For each size, two overlapping lists of entries are made (every 10th entry has notes),
+    and each operation used by MyList is timed. The list-based implementations they replaced
+    are also timed, up to --legacy-max entries, since they are quadratic.
+
+    Usage:
+        python -m benchmarks.bench_entries [--sizes 10000 50000 100000] [--legacy-max 10000] [--json results.json]
+"""
+
+# Imports
+import json
+import time
+import argparse
+
+# Local Imports
+from entry_set import EntrySet
+
+
+def make_entries(n, start=0):
+    """ Returns n entries, with ids from start; every 10th entry has notes.
+    r-type: list of dicts """
+    entries = []
+    for film_id in range(start, start+n):
+        if film_id % 10:
+            entries.append({'filmId': film_id})
+        else:
+            entries.append({'filmId': film_id, 'review': f"Notes on {film_id}", 'containsSpoilers': False})
+    return entries
+
+
+"""
+** Cases **
+Each case takes the current entries (a) and other entries (b), as in MyList.append(b) etc.
+"""
+def append(a, b):
+    return (EntrySet(a) | EntrySet(b).without_notes()).to_list()
+
+def remove(a, b):
+    return (EntrySet(a) - b).to_list()
+
+def replace(a, b):
+    return EntrySet(b).without_notes().to_list()
+
+def intersection(a, b):
+    return (EntrySet(a) & b).to_list()
+
+def symmetric_difference(a, b):
+    return (EntrySet(a) ^ b).to_list()
+
+## The implementations of MyList.append and MyList.remove before EntrySet
+def legacy_append(a, b):
+    others = []
+    [others.append(entry['filmId']) for entry in b]
+    unique_film_ids = set(others)
+    merged_others = []
+    for i in others:
+        if i not in unique_film_ids:
+            continue
+        merged_others.append({'filmId': i})
+        unique_film_ids.remove(i)
+
+    results = []
+    [[results.append(entry) for entry in entries] for entries in (a, merged_others)]
+    unique_film_ids = set([i['filmId'] for i in results])
+    unique_results = []
+    for i in results:
+        if (film_id := i['filmId']) not in unique_film_ids:
+            continue
+        unique_results.append(i)
+        unique_film_ids.remove(film_id)
+    return unique_results
+
+def legacy_remove(a, b):
+    return [i for i in a if i['filmId'] not in [j['filmId'] for j in b]]
+
+## (label, case, legacy case or None)
+CASES = [
+    ('append', append, legacy_append),
+    ('remove', remove, legacy_remove),
+    ('replace', replace, None),
+    ('intersection', intersection, None),
+    ('symmetric_difference', symmetric_difference, None),
+]
+
+
+"""
+** Timing **
+"""
+def time_case(case, a, b, repeats):
+    """ Returns the best time (in seconds) of several calls to the case. """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        case(a, b)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(sizes=(10000, 50000, 100000), legacy_max=10000, repeats=3):
+    """ Runs every case at every size, printing (and returning) the results.
+    r-type: list of dicts """
+    results = []
+    print(f"{'case':<24}{'entries':>10}{'ms':>12}{'legacy ms':>12}{'speedup':>10}  same as legacy")
+    for n in sizes:
+        # The other list overlaps with the second half of the current one
+        a, b = make_entries(n), make_entries(n, start=n//2)
+        for label, case, legacy in CASES:
+            result = dict(case=label, entries=n, ms=1000 * time_case(case, a, b, repeats), legacy_ms=None, equivalent=None)
+            if legacy and n <= legacy_max:
+                result['legacy_ms'] = 1000 * time_case(legacy, a, b, 1)
+                result['equivalent'] = case(a, b) == legacy(a, b)
+            results.append(result)
+
+            legacy_ms = f"{result['legacy_ms']:>12.1f}{result['legacy_ms'] / result['ms']:>9.1f}x" if result['legacy_ms'] else f"{'-':>12}{'-':>10}"
+            print(f"{label:<24}{n:>10}{result['ms']:>12.1f}{legacy_ms}  {'' if result['equivalent'] is None else result['equivalent']}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the set operations on list entries.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000], help="numbers of entries to try")
+    parser.add_argument('--legacy-max', type=int, default=10000, help="largest size to time the old implementations at")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--json', help="file to write the results to")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.legacy_max, args.repeats)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,195 @@
+"""
+    Runs the scrapers against the fake server (benchmarks/fake_server.py) and reports
+    their throughput (pages/sec), request latency percentiles and errors.
+
+    The server is started in-process unless --url is given, in which case an
+    already running server is used (e.g. one started with a higher latency or error rate).
+
+    Usage:
+        python -m benchmarks.bench_load [--workers 1 4 8] [--latency 0.05] [--error-rate 0.01] [--json results.json]
+        python -m benchmarks.bench_load --url http://localhost:8000/
+"""
+
+# Imports
+import os
+import json
+import time
+import tempfile
+import argparse
+import threading
+
+# Local Imports
+from benchmarks.fake_server import start_server
+from session import SESSION
+from rate_limiter import AdaptiveRateLimiter
+from catalog import Catalog, set_catalog
+from film_info import FilmInfo
+from watched import Watched
+from film_search import FilmSearch
+from users_by_film_rating import FilmRaters
+from list_maker import MyList
+from list_sync import ListSync
+import social_network
+
+
+class Recorder():
+    """ Records the latency and status of each response the SESSION receives. """
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, response, *args, **kwargs):
+        """ A requests response hook. """
+        with self.lock:
+            self.latencies.append(response.elapsed.total_seconds())
+            if response.status_code >= 400:
+                self.errors[response.status_code] = self.errors.get(response.status_code, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.latencies = []
+            self.errors = {}
+
+    @staticmethod
+    def percentile(values, p):
+        """ Returns the p-th percentile of a list of values (nearest rank). """
+        if not values:
+            return 0
+        values = sorted(values)
+        return values[min(len(values)-1, int(len(values) * p / 100))]
+
+    def summary(self, elapsed):
+        """ Returns the statistics for the requests recorded since the last reset.
+        r-type: dict """
+        with self.lock:
+            latencies = list(self.latencies)
+            errors = dict(self.errors)
+        return {
+            'pages': len(latencies),
+            'seconds': elapsed,
+            'pages_per_sec': len(latencies) / elapsed if elapsed else 0,
+            **{f'p{p}_ms': 1000 * self.percentile(latencies, p) for p in (50, 95, 99)},
+            'errors': errors
+        }
+
+
+"""
+** Scenarios **
+Each scenario takes the number of workers and runs a scraper.
+"""
+def film_search(max_workers):
+    return FilmSearch(genre='drama')(max_workers)
+
+def watched(max_workers):
+    return Watched('loadtester')(max_workers)
+
+def film_raters(max_workers):
+    # Tries each rating in turn, since the middle ratings may have no route to them
+    return [list(FilmRaters('film-1').iter_users(rating, max_workers=max_workers)) for rating in (10, 1)]
+
+def film_info(max_workers):
+    return [FilmInfo(f"film-{i}").ratings for i in range(20)]
+
+def followers(max_workers):
+    return social_network.get_followers('loadtester')
+
+def my_list(max_workers):
+    entries = [{'filmId': 10000+i} for i in range(250)]
+    my_list = MyList.new(f"Load Test {time.time_ns()}", entries=entries)
+    my_list.update(description="Updated by the load test.")
+    # Without the confirmation prompt of MyList.delete()
+    SESSION.request("POST", my_list.suburl_delete)
+
+def list_sync(max_workers):
+    # Creates 10 lists, then syncs them again (which should only load them), then deletes them
+    run_id = time.time_ns()
+    desired = [{'name': f"Sync Test {run_id} {i}", 'entries': [{'filmId': 10000+j} for j in range(i, 100+i)]} for i in range(10)]
+    plans = ListSync(desired, max_workers)()
+    ListSync(desired, max_workers)()
+    for plan in plans:
+        SESSION.request("POST", plan['list'].suburl_delete)
+
+## (name, scenario, whether the scenario uses max_workers)
+SCENARIOS = [
+    ('FilmSearch', film_search, True),
+    ('Watched', watched, True),
+    ('FilmRaters', film_raters, True),
+    ('FilmInfo (x20)', film_info, False),
+    ('social_network.get_followers', followers, False),
+    ('MyList new/update/delete', my_list, False),
+    ('ListSync (10 lists)', list_sync, True),
+]
+
+
+def run(workers=(1,), only=None):
+    """ Runs each scenario with each number of workers, printing (and returning) the results.
+    r-type: list of dicts """
+    recorder = Recorder()
+    SESSION.hooks['response'].append(recorder)
+    results = []
+
+    print(f"{'scenario':<32}{'workers':>8}{'pages':>8}{'pages/sec':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  errors")
+    try:
+        for name, scenario, uses_workers in SCENARIOS:
+            if only and name not in only:
+                continue
+            for max_workers in (workers if uses_workers else [1]):
+                recorder.reset()
+                error = None
+                start = time.perf_counter()
+                try:
+                    scenario(max_workers)
+                except Exception as e:
+                    error = repr(e)
+                result = dict(scenario=name, workers=max_workers, exception=error, **recorder.summary(time.perf_counter() - start))
+                results.append(result)
+                print(
+                    f"{name:<32}{max_workers:>8}{result['pages']:>8}{result['pages_per_sec']:>11.1f}"
+                    f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}  {result['errors'] or ''}{error or ''}"
+                )
+    finally:
+        SESSION.hooks['response'].remove(recorder)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the scrapers against a fake Letterboxd server.")
+    parser.add_argument('--url', help="the url of a running fake server (otherwise one is started)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help="max_workers values to try")
+    parser.add_argument('--scenario', nargs='+', help="only run these scenarios")
+    parser.add_argument('--films', type=int, default=10000)
+    parser.add_argument('--watched', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--throttle-rate', type=float, default=0)
+    parser.add_argument('--rate', type=float, help="override the rate limit of every route class (requests/sec)")
+    parser.add_argument('--json', help="file to write the results to")
+    args = parser.parse_args()
+
+    if not (url := args.url):
+        server, url = start_server(
+            num_films=args.films, watched_per_user=args.watched, latency=args.latency, jitter=args.jitter,
+            error_rate=args.error_rate, throttle_rate=args.throttle_rate
+        )
+
+    ## Point the SESSION at the server, keeping its cookies and search options apart from the real ones
+    SESSION.MAIN_URL = url
+    SESSION.cookie_store = "cache/bench_load_cookies"
+    SESSION.search_options_store = "cache/bench_load_search_options"
+    # ...and its films apart from the real catalog (their ids overlap with real films)
+    catalog_dir = tempfile.TemporaryDirectory()
+    set_catalog(Catalog(os.path.join(catalog_dir.name, "catalog.sqlite3")))
+    if args.rate:
+        SESSION.rate_limiter = AdaptiveRateLimiter(
+            [(name, method, pattern.pattern, args.rate) for name, method, pattern, _ in SESSION.rate_limiter.route_classes]
+        )
+    print(f"Load testing against {url}")
+
+    results = run(args.workers, args.scenario)
+    print(SESSION.rate_limiter)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
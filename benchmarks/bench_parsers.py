@@ -0,0 +1,231 @@
+"""
+    Benchmarks the parsing done by each scraper, without making any requests.
+
+    Each page type is loaded from benchmarks/fixtures/<name>.html if it has been recorded
+    (see --record), otherwise a synthetic page with the same structure is used.
+    Every extractor backend is timed, and its results are checked against the soup backend.
+
+    Usage:
+        python -m benchmarks.bench_parsers [--seconds 1] [--json results.json]
+        python -m benchmarks.bench_parsers --record --film black-swan --username lucindaj --list "some list" --my-list "my list"
+"""
+
+# Imports
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+# Local Imports
+from benchmarks import pages
+import extract
+import catalog
+from session import SESSION
+from film_info import FilmInfo
+from watched import Watched
+from film_search import FilmSearch
+from users_by_film_rating import FilmRaters
+from list_maker import LetterboxdList, MyList, ListSnapshot
+import social_network
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+"""
+** Fixtures **
+"""
+def synthetic_fixtures():
+    """ Returns a synthetic page for each page type, at the size of a typical real page.
+    r-type: dict """
+    films = pages.make_films(500)
+    list_data = {
+        'list_id': 1234, 'username': 'tester', 'name': 'A Synthetic List', 'slug': 'a-synthetic-list',
+        'tags': ['horror', '2020'], 'public': True, 'ranked': True, 'description': 'Made up films.'
+    }
+    ratings = {r: [f"user{r}_{i}" for i in range(50)] for r in range(10, 0, -1)}
+    comments = [{'id': 500+i, 'username': f"user{i}", 'timestamp': 1600000000+i, 'comment': "Nice list! "*5} for i in range(100)]
+    return {
+        'film': pages.film_page(films[0]),
+        'histogram': pages.rating_histogram(films[0]),
+        'watched': pages.watched_page(films[:72], 'tester', 1, 40),
+        'search': pages.search_page(films[:72], 2880),
+        'ratings': pages.ratings_page(ratings, 1, 10),
+        'list_view': pages.list_view_page(list_data, films[:100], 1, 5),
+        'list_edit': pages.list_edit_page(list_data, [{'filmId': f['id'], 'review': 'A note' if i%5==0 else ''} for i, f in enumerate(films)]),
+        'comments': pages.comments_section(list_data, comments),
+        'followers': pages.people_page([f"user{i}" for i in range(25)])
+    }
+
+def load_fixtures():
+    """ Returns the page for each page type, preferring recorded fixtures to synthetic ones.
+    r-type: dict of tuples (html, source) """
+    fixtures = {}
+    for name, page in synthetic_fixtures().items():
+        path = os.path.join(FIXTURES_DIR, f"{name}.html")
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                fixtures[name] = (f.read(), 'recorded')
+        else:
+            fixtures[name] = (page, 'synthetic')
+    return fixtures
+
+def record_fixtures(film, username, list_name, my_list_name):
+    """ Records each page type from Letterboxd to the fixtures directory. """
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    other_list = LetterboxdList(list_name, username)
+
+    # Only the formatted name of the user's list is needed, so it isn't loaded
+    my_list = MyList.__new__(MyList)
+    my_list.user_defined_name = my_list_name
+
+    suburls = {
+        'film': (f"film/{film}/", {}),
+        'histogram': (f"csi/film/{film}/rating-histogram/", {}),
+        'watched': (f"{username}/films/page/1/", {}),
+        'search': ("films/ajax/popular/size/small/", {}),
+        'ratings': (f"film/{film}/ratings/page/1", {}),
+        'list_view': (other_list.view_list, {}),
+        'list_edit': (f"{SESSION.username}/list/{my_list.get_formatted_name()}/edit", {'login_required': True}),
+        'comments': (f"csi/list/{other_list._id}/comments-section/?", {'params': {'esiAllowUser': True}}),
+        'followers': (f"{username}/followers/", {})
+    }
+    for name, (suburl, kwargs) in suburls.items():
+        response = SESSION.request("GET", suburl, **kwargs)
+        with open(os.path.join(FIXTURES_DIR, f"{name}.html"), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"Recorded {name} ({len(response.text):,} chars)")
+
+
+"""
+** Cases **
+Each case takes the html of a page and returns the result of parsing it.
+"""
+def film_info_details(page):
+    return extract.get_extractor().film_details(page)
+
+def film_info_ratings(page):
+    film = FilmInfo.__new__(FilmInfo)
+    film.histogram = extract.get_extractor().rating_histogram(page)
+    return film.ratings
+
+def watched_page(page):
+    return Watched.get_page_of_film_ids(page), extract.get_extractor().last_page(page)
+
+def film_raters_page(page):
+    return [FilmRaters.get_page_of_users(page, rating) for rating in range(1, 11)]
+
+def list_view(page):
+    return ListSnapshot(**extract.get_extractor().list_view(page)).as_dict()
+
+def list_edit(page):
+    return ListSnapshot(**extract.get_extractor().list_edit(page)).as_dict()
+
+def comments_section(page):
+    body = extract.SoupExtractor.parse(page).find('div', class_='body')
+    return [(i['id'], i['data-person'], i['data-creation-timestamp']) for i in body.find_all('li', attrs={'data-person': True})]
+
+def people(page):
+    return getattr(social_network, '__get_people')(page)
+
+## (label, fixture name, case, whether the case uses the extractor backends)
+CASES = [
+    ('FilmInfo.__get_film_info', 'film', film_info_details, True),
+    ('FilmInfo.ratings', 'histogram', film_info_ratings, True),
+    ('Watched.__call__ (per page)', 'watched', watched_page, True),
+    ('FilmSearch.get_page_of_films', 'search', FilmSearch.get_page_of_films, True),
+    ('FilmRaters.__call__ (per page)', 'ratings', film_raters_page, True),
+    ('LetterboxdList.load (snapshot)', 'list_view', list_view, True),
+    ('MyList.load (snapshot)', 'list_edit', list_edit, True),
+    ('LetterboxdList.comments', 'comments', comments_section, False),
+    ('social_network.__get_people', 'followers', people, True),
+]
+
+
+"""
+** Timing **
+"""
+def time_case(case, page, seconds):
+    """ Calls the case repeatedly for (at least) the given number of seconds.
+    r-type: dict """
+    # Peak memory allocated during a single call
+    tracemalloc.start()
+    case(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    calls = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        case(page)
+        calls += 1
+
+    return {
+        'ops_per_sec': calls / elapsed,
+        'mean_ms': 1000 * elapsed / calls,
+        'peak_kib': peak / 1024
+    }
+
+def run(seconds=1):
+    """ Runs every case for every backend, printing (and returning) the results.
+    r-type: list of dicts """
+    fixtures = load_fixtures()
+    original_backend = extract.get_extractor().name
+    results = []
+
+    # Keep the (often synthetic) films out of the catalog, and the catalog's writes out of the timings
+    original_catalog = catalog.get_catalog()
+    catalog.set_catalog(None)
+
+    print(f"{'case':<32}{'fixture':<12}{'backend':<8}{'ops/sec':>10}{'mean ms':>10}{'peak KiB':>10}  same as soup")
+    for label, fixture_name, case, uses_backends in CASES:
+        page, source = fixtures[fixture_name]
+        backends = list(extract.BACKENDS) if uses_backends else [None]
+
+        extract.set_backend('soup')
+        expected = case(page)
+
+        for backend in backends:
+            if backend:
+                extract.set_backend(backend)
+            result = dict(
+                case=label,
+                fixture=f"{fixture_name} ({source})",
+                backend=backend or '-',
+                equivalent=case(page) == expected,
+                **time_case(case, page, seconds)
+            )
+            results.append(result)
+            print(
+                f"{label:<32}{fixture_name:<12}{result['backend']:<8}"
+                f"{result['ops_per_sec']:>10.1f}{result['mean_ms']:>10.3f}{result['peak_kib']:>10.1f}  {result['equivalent']}"
+            )
+
+    extract.set_backend(original_backend)
+    catalog.set_catalog(original_catalog)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers' parsing on recorded (or synthetic) pages.")
+    parser.add_argument('--seconds', type=float, default=1, help="time spent on each case")
+    parser.add_argument('--json', help="file to write the results to")
+    parser.add_argument('--record', action='store_true', help="record the fixtures from Letterboxd")
+    parser.add_argument('--film', default='black-swan')
+    parser.add_argument('--username', default=SESSION.username)
+    parser.add_argument('--list', help="the name of a list owned by --username")
+    parser.add_argument('--my-list', help="the name of a list owned by the session user")
+    args = parser.parse_args()
+
+    if args.record:
+        if not (args.list and args.my_list):
+            sys.exit("--list and --my-list are required to record fixtures")
+        record_fixtures(args.film, args.username, args.list, args.my_list)
+        sys.exit()
+
+    results = run(args.seconds)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,400 @@
+"""
+    A local stand-in for Letterboxd, for load testing the scrapers without touching the real site.
+
+    It serves the URLs used by this program, with synthetic data generated at the given scale.
+    Latency, 429s (with Retry-After) and 5xx errors can be injected.
+
+    Usage:
+        python -m benchmarks.fake_server --port 8000 --films 100000 --latency 0.05 --error-rate 0.01
+
+    Then point the session at it, either with the environment variable
+        LETTERBOXD_URL=http://localhost:8000/
+    or in code:
+        SESSION.MAIN_URL = "http://localhost:8000/"
+"""
+
+# Imports
+import re
+import ast
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Local Imports
+from benchmarks import pages
+
+
+def slugify(name):
+    """ The url of a list, given its name (the same as LetterboxdList.get_formatted_name). """
+    slug = re.sub(r"[^\w\- ]", "", name.lower().replace(' ', '-'))
+    return re.sub(" +", " ", slug).strip()
+
+
+class FakeLetterboxd():
+    """ The data served by the fake server, and the faults it injects. """
+
+    ## Items per page, by page type
+    search_page_size = 72
+    watched_page_size = 72
+    list_page_size = 100
+    ratings_page_size = 500
+    people_page_size = 25
+
+    ## Whether list pages are sent with an ETag (and so can be revalidated)
+    list_etags = True
+
+    def __init__(self, num_films=10000, watched_per_user=1000, followers_per_user=100,
+            latency=0, jitter=0, error_rate=0, throttle_rate=0, seed=0):
+        """
+        Parameters:
+        - num_films (int) - the size of the film catalog
+        - watched_per_user (int) - the number of films each user has watched
+        - followers_per_user (int)
+        - latency (float) - seconds added to every response
+        - jitter (float) - up to this many seconds are randomly added to the latency
+        - error_rate (float) - the fraction of requests which receive a 503
+        - throttle_rate (float) - the fraction of requests which receive a 429
+        - seed (int)
+        """
+        self.films = pages.make_films(num_films, seed)
+        self.films_by_slug = {f['slug']: f for f in self.films}
+        self.films_by_id = {f['id']: f for f in self.films}
+        self.watched_per_user = min(watched_per_user, num_films)
+        self.followers_per_user = followers_per_user
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.seed = seed
+
+        ## Lists and comments created through the server
+        self.lists = {}
+        self.comments = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+        ## Count of responses by status code
+        self.stats = {}
+
+    def get_id(self):
+        """ Returns a new id for a list or comment. """
+        with self.lock:
+            self.next_id += 1
+            return self.next_id
+
+    """
+    ** Data **
+    """
+    def search(self, year=None, decade=None, genre=None):
+        """ Returns the films matching a search. """
+        films = self.films
+        if year:
+            films = [f for f in films if f['year'] == int(year)]
+        elif decade:
+            films = [f for f in films if f['year']//10*10 == int(decade[:-1])]
+        if genre:
+            films = [f for f in films if genre in f['genres']]
+        return films
+
+    def watched(self, username):
+        """ Returns the films a user has watched (the same films each time). """
+        rng = random.Random(f"{self.seed}-{username}")
+        return sorted(rng.sample(self.films, self.watched_per_user), key=lambda f: f['name'])
+
+    def people(self, username, relation):
+        """ Returns the usernames of a user's followers/following/blocked users. """
+        return [f"{username}-{relation}-{i}" for i in range(self.followers_per_user)]
+
+    def raters(self, film, sort_by, page_num):
+        """ Returns the users on a page of a film's ratings, grouped by rating.
+        r-type: dict {rating: [usernames]} """
+        ratings = range(1, 11) if 'lowest' in sort_by else range(10, 0, -1)
+        start = (page_num-1) * self.ratings_page_size
+        end = start + self.ratings_page_size
+
+        groups = {}
+        offset = 0
+        for rating in ratings:
+            count = film['histogram'][rating-1]
+            first, last = max(start, offset), min(end, offset+count)
+            if first < last:
+                groups[rating] = [f"{film['slug']}-{rating}-{i-offset}" for i in range(first, last)]
+            offset += count
+        return groups
+
+    def find_list(self, username, slug):
+        """ Returns a list created through the server, or one generated from the catalog. """
+        if slug in self.lists:
+            return self.lists[slug]
+        rng = random.Random(f"{self.seed}-{username}-{slug}")
+        films = rng.sample(self.films, min(len(self.films), rng.randint(50, 1500)))
+        return {
+            'list_id': abs(hash(slug)) % 10**7, 'username': username, 'name': slug.replace('-', ' ').title(),
+            'slug': slug, 'tags': [], 'public': True, 'ranked': False, 'description': 'A generated list.',
+            'entries': [{'filmId': f['id']} for f in films]
+        }
+
+    def save_list(self, form, username):
+        """ Creates or updates a list, given the form data of a save-list request. """
+        get = lambda key, default='': form.get(key, [default])[0]
+        list_id = get('filmListId')
+        existing = next((l for l in self.lists.values() if str(l['list_id']) == list_id), None) if list_id else None
+
+        list_data = {
+            'list_id': int(list_id) if existing else self.get_id(),
+            'username': username,
+            'name': get('name'),
+            'slug': slugify(get('name')),
+            'tags': form.get('tag', []),
+            'public': get('publicList') == 'true',
+            'ranked': get('numberedList') == 'true',
+            'description': get('notes'),
+            'entries': ast.literal_eval(get('entries', '[]'))
+        }
+        with self.lock:
+            if existing:
+                del self.lists[existing['slug']]
+            self.lists[list_data['slug']] = list_data
+
+
+class Handler(BaseHTTPRequestHandler):
+    """ Routes each request to the page that Letterboxd would have served. """
+
+    protocol_version = "HTTP/1.1"
+
+    ## (method, pattern, name of the handler method)
+    ROUTES = [
+        ("GET", r"^/$", "main"),
+        ("POST", r"^/user/login\.do$", "login"),
+        ("GET", r"^/films/ajax/popular/(?:year/(?P<year>\d+)/)?(?:decade/(?P<decade>\d+s)/)?(?:genre/(?P<genre>[\w-]+)/)?size/small/(?:page/(?P<page>\d+)/)?$", "search"),
+        ("GET", r"^/csi/film/(?P<slug>[\w-]+)/rating-histogram/$", "histogram"),
+        ("GET", r"^/film/(?P<slug>[\w-]+)/(?P<sort_by>ratings/(?:by/entry-rating-lowest/)?)page/(?P<page>\d+)/?$", "ratings"),
+        ("GET", r"^/film/(?P<slug>[\w-]+)/$", "film"),
+        ("GET", r"^/csi/list/(?P<list_id>\d+)/comments-section/$", "comments"),
+        ("GET", r"^/s/full-text/comment:(?P<comment_id>\d+)/$", "comment_text"),
+        ("POST", r"^/s/save-list$", "save_list"),
+        ("POST", r"^/s/filmlist:(?P<list_id>\d+)/add-comment$", "add_comment"),
+        ("POST", r"^/ajax/filmListComment:(?P<comment_id>\d+)/delete-comment/$", "delete_comment"),
+        ("GET", r"^/(?P<username>[\w-]+)/list/(?P<slug>[\w-]+)/edit/?$", "list_edit"),
+        ("POST", r"^/(?P<username>[\w-]+)/list/(?P<slug>[\w-]+)/delete/$", "list_delete"),
+        ("GET", r"^/(?P<username>[\w-]+)/list/(?P<slug>[\w-]+)/(?:page/(?P<page>\d+)/)?$", "list_view"),
+        ("GET", r"^/(?P<username>[\w-]+)/(?P<relation>followers|following|blocked)/(?:page/(?P<page>\d+)/)?$", "people"),
+        ("GET", r"^/(?P<username>[\w-]+)/films/$", "films_menu"),
+        ("GET", r"^/(?P<username>[\w-]+)/films/(?P<search>.*?)page/(?P<page>\d+)/$", "watched"),
+    ]
+
+    @property
+    def data(self):
+        return self.server.data
+
+    def log_message(self, *args):
+        """ Don't log every request. """
+
+    def do_GET(self):
+        self.route("GET")
+
+    def do_POST(self):
+        self.route("POST")
+
+    def route(self, method):
+        """ Injects any faults, then calls the handler for the request's path. """
+        url = urlsplit(self.path)
+        path = re.sub("/+", "/", url.path)
+        self.query = parse_qs(url.query)
+        self.form = {}
+        if method == "POST":
+            length = int(self.headers.get('Content-Length', 0))
+            self.form = parse_qs(self.rfile.read(length).decode(), keep_blank_values=True)
+
+        if self.data.latency or self.data.jitter:
+            time.sleep(self.data.latency + random.random() * self.data.jitter)
+
+        if random.random() < self.data.throttle_rate:
+            return self.respond("Too Many Requests", status=429, headers={'Retry-After': '1'})
+        if random.random() < self.data.error_rate:
+            return self.respond("Service Unavailable", status=503)
+
+        for route_method, pattern, name in self.ROUTES:
+            if route_method == method and (match := re.match(pattern, path)):
+                try:
+                    return getattr(self, name)(**{k:v for k,v in match.groupdict().items()})
+                except (KeyError, StopIteration):
+                    return self.respond("Not Found", status=404)
+                except Exception as e:
+                    return self.respond(f"Internal Server Error: {e!r}", status=500)
+        self.respond("Not Found", status=404)
+
+    def respond(self, body, status=200, content_type="text/html; charset=utf-8", headers=None):
+        """ Sends a response, and counts it by status code. """
+        body = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k,v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.data.lock:
+            self.data.stats[status] = self.data.stats.get(status, 0) + 1
+
+    def respond_json(self, result=True, **kwargs):
+        """ Sends the json that Letterboxd responds with after a POST. """
+        self.respond(json.dumps({'result': result, 'messages': [], **kwargs}, indent=8), content_type="application/json")
+
+    @property
+    def current_user(self):
+        """ The username the request was made as (from its login cookie), or None. """
+        match = re.search(r"letterboxd\.user\.CURRENT=([\w-]+)", self.headers.get('Cookie') or '')
+        return match.group(1) if match else None
+
+    @property
+    def logged_in(self):
+        return self.current_user is not None
+
+    """
+    ** Handlers **
+    """
+    def main(self):
+        self.respond(pages.main_page(self.logged_in), headers={'Set-Cookie': 'com.xk72.webparts.csrf=fakecsrf; Path=/'})
+
+    def login(self):
+        self.respond(
+            json.dumps({'result': 'success', 'messages': [], 'csrf': 'fakecsrf'}, indent=8),
+            content_type="application/json",
+            headers={'Set-Cookie': f"letterboxd.user.CURRENT={self.form['username'][0]}; Path=/"}
+        )
+
+    def search(self, year, decade, genre, page):
+        page_num = int(page or 1)
+        films = self.data.search(year, decade, genre)
+        size = self.data.search_page_size
+        self.respond(pages.search_page(films[(page_num-1)*size:page_num*size], len(films), page_num))
+
+    def histogram(self, slug):
+        self.respond(pages.rating_histogram(self.data.films_by_slug[slug]))
+
+    def film(self, slug):
+        self.respond(pages.film_page(self.data.films_by_slug[slug]))
+
+    def ratings(self, slug, sort_by, page):
+        film = self.data.films_by_slug[slug]
+        last_page = min(10, sum(film['histogram']) // self.data.ratings_page_size + 1)
+        self.respond(pages.ratings_page(self.data.raters(film, sort_by, int(page)), int(page), last_page))
+
+    def watched(self, username, search, page):
+        page_num = int(page)
+        films = self.data.watched(username)
+        if genre := re.search(r"genre/([\w-]+)/", search):
+            films = [f for f in films if genre.group(1) in f['genres']]
+        if year := re.search(r"year/(\d+)/", search):
+            films = [f for f in films if f['year'] == int(year.group(1))]
+        size = self.data.watched_page_size
+        last_page = max(1, -(-len(films) // size))
+        self.respond(pages.watched_page(films[(page_num-1)*size:page_num*size], username, page_num, last_page))
+
+    def films_menu(self, username):
+        self.respond(pages.films_menu_page(username))
+
+    def people(self, username, relation, page):
+        page_num = int(page or 1)
+        usernames = self.data.people(username, relation)
+        size = self.data.people_page_size
+        last_page = max(1, -(-len(usernames) // size))
+        self.respond(pages.people_page(usernames[(page_num-1)*size:page_num*size], page_num, last_page))
+
+    def list_view(self, username, slug, page):
+        list_data = self.data.find_list(username, slug)
+        page_num = int(page or 1)
+        size = self.data.list_page_size
+        entries = list_data['entries'][(page_num-1)*size:page_num*size]
+        films = [self.data.films_by_id[e['filmId']] for e in entries if e['filmId'] in self.data.films_by_id]
+        last_page = max(1, -(-len(list_data['entries']) // size))
+        # The ETag changes whenever any part of the list does, as it would with Letterboxd's "updated" time
+        if not self.data.list_etags:
+            return self.respond(pages.list_view_page(list_data, films, page_num, last_page))
+        etag = f'"{hashlib.sha1(repr(list_data).encode()).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self.respond('', status=304, headers={'ETag': etag})
+        self.respond(pages.list_view_page(list_data, films, page_num, last_page), headers={'ETag': etag})
+
+    def list_edit(self, username, slug):
+        if slug not in self.data.lists:
+            raise KeyError(slug)
+        list_data = self.data.lists[slug]
+        self.respond(pages.list_edit_page(list_data, list_data['entries']))
+
+    def list_delete(self, username, slug):
+        with self.data.lock:
+            self.data.lists.pop(slug, None)
+        self.respond_json()
+
+    def save_list(self):
+        self.data.save_list(self.form, self.current_user)
+        self.respond_json()
+
+    def comments(self, list_id):
+        list_data = next(l for l in self.data.lists.values() if str(l['list_id']) == list_id)
+        self.respond(pages.comments_section(list_data, self.data.comments.get(int(list_id), [])))
+
+    def comment_text(self, comment_id):
+        comment = next(c for comments in self.data.comments.values() for c in comments if c['id'] == int(comment_id))
+        self.respond(f"<p>{comment['comment']}</p>")
+
+    def add_comment(self, list_id):
+        comment = {
+            'id': self.data.get_id(),
+            'username': self.current_user,
+            'timestamp': int(time.time()),
+            'comment': self.form['comment'][0]
+        }
+        with self.data.lock:
+            self.data.comments.setdefault(int(list_id), []).append(comment)
+        self.respond_json()
+
+    def delete_comment(self, comment_id):
+        with self.data.lock:
+            for comments in self.data.comments.values():
+                comments[:] = [c for c in comments if c['id'] != int(comment_id)]
+        self.respond_json()
+
+
+def start_server(port=0, **kwargs):
+    """ Starts the fake server in a background thread.
+    The keyword arguments are passed to FakeLetterboxd.
+    r-type: tuple (server, url) """
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.data = FakeLetterboxd(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic stand-in for Letterboxd.")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--films', type=int, default=10000, help="size of the film catalog")
+    parser.add_argument('--watched', type=int, default=1000, help="films watched by each user")
+    parser.add_argument('--followers', type=int, default=100, help="followers of each user")
+    parser.add_argument('--latency', type=float, default=0, help="seconds added to each response")
+    parser.add_argument('--jitter', type=float, default=0, help="up to this many seconds randomly added to the latency")
+    parser.add_argument('--error-rate', type=float, default=0, help="fraction of requests that receive a 503")
+    parser.add_argument('--throttle-rate', type=float, default=0, help="fraction of requests that receive a 429")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server, url = start_server(
+        args.port, num_films=args.films, watched_per_user=args.watched, followers_per_user=args.followers,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed
+    )
+    print(f"Serving a fake Letterboxd at {url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
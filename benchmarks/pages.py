@@ -0,0 +1,248 @@
+"""
+    Renders synthetic pages with the same structure as the Letterboxd pages the scrapers read.
+    These are used when no recorded fixture is available, and by the fake server.
+
+    Every page is built from a deterministic catalog of made-up films, so results are repeatable.
+"""
+
+# Imports
+import random
+from html import escape
+
+
+SERVICES = ['netflix', 'amazon-prime-video', 'mubi', 'disney-plus', 'apple-tv-plus']
+FILTERS = {'liked': ['show', 'hide'], 'logged': ['show', 'hide'], 'reviewed': ['show', 'hide'],
+    'watchlisted': ['show', 'hide'], 'shorts': ['show', 'hide'], 'docs': ['hide'], 'unreleased': ['hide']}
+GENRES = ['action', 'adventure', 'animation', 'comedy', 'crime', 'documentary', 'drama', 'family', 'fantasy',
+    'history', 'horror', 'music', 'mystery', 'romance', 'science-fiction', 'thriller', 'tv-movie', 'war', 'western']
+LANGUAGES = ['english', 'french', 'german', 'japanese', 'korean', 'spanish', 'italian']
+COUNTRIES = ['usa', 'uk', 'france', 'germany', 'japan', 'south-korea', 'spain', 'italy']
+
+## Markup that surrounds the content of every page (the real pages have a lot of it)
+PAGE_HEADER = '<header class="site-header"><nav><ul class="navitems">' + ''.join(
+    [f'<li class="navitem"><a href="/section-{i}/" class="navlink">Section {i}</a></li>' for i in range(60)]
+) + '</ul></nav></header>'
+PAGE_FOOTER = '<footer class="site-footer"><div class="links">' + ''.join(
+    [f'<p class="footer-link"><a href="/about/{i}/">About {i}</a> &middot; <span>Info {i}</span></p>' for i in range(80)]
+) + '</div></footer>'
+
+
+def make_films(n, seed=0):
+    """ Returns a list of n made-up films.
+    r-type: list of dicts """
+    rng = random.Random(seed)
+    films = []
+    for i in range(n):
+        name = f"Film {i} {rng.choice(['Returns', 'Rising', 'Night', 'Story', 'Forever', 'Part II'])}"
+        obscure = rng.random() < 0.2
+        films.append({
+            'id': 10000 + i,
+            'slug': f"film-{i}",
+            'name': name,
+            'year': rng.randint(1910, 2020),
+            'genres': sorted(rng.sample(GENRES, rng.randint(1, 3))),
+            'language': rng.choice(LANGUAGES),
+            'country': rng.choice(COUNTRIES),
+            'length': rng.randint(70, 180),
+            'histogram': [rng.randint(0, 5 if obscure else 5000) for _ in range(10)]
+        })
+    return films
+
+def wrap_page(body, body_class='', owner=''):
+    """ Wraps the content of a page with the rest of an html document. """
+    return (
+        f'<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Letterboxd</title></head>'
+        f'<body class="{body_class}" data-owner="{owner}">{PAGE_HEADER}<div id="content" class="site-body">'
+        f'{body}</div>{PAGE_FOOTER}</body></html>'
+    )
+
+def pagination(page_num, last_page):
+    """ The pagination block at the bottom of a paginated page. """
+    if last_page <= 1:
+        return ''
+    items = ''
+    for i in sorted(set([1, 2, page_num-1, page_num, page_num+1, last_page-1, last_page])):
+        if not 1 <= i <= last_page:
+            continue
+        if i == page_num:
+            items += f'<li class="paginate-page paginate-current"><span>{i}</span></li>'
+        else:
+            items += f'<li class="paginate-page"><a href="page/{i}/">{i}</a></li>'
+    return f'<div class="pagination"><div class="paginate-pages"><ul>{items}</ul></div></div>'
+
+def poster(film, li_class='poster-container', numbered=None):
+    """ A film poster, as it appears in searches and lists. """
+    number = f'<p class="list-number">{numbered}</p>' if numbered else ''
+    li_class += ' numbered-list-item' if numbered else ''
+    return (
+        f'<li class="{li_class}">'
+        f'<div class="really-lazy-load poster film-poster film-poster-{film["id"]} linked-film-poster" '
+        f'data-film-id="{film["id"]}" data-film-name="{escape(film["name"])}" data-film-slug="{film["slug"]}" '
+        f'data-film-link="/film/{film["slug"]}/" data-film-release-year="{film["year"]}">'
+        f'<img src="/empty.png" class="image" width="70" height="105" alt="{escape(film["name"])}"/>'
+        f'<span class="frame"><span class="frame-title"></span></span></div>{number}</li>'
+    )
+
+
+def main_page(logged_in=False):
+    """ The home page. """
+    body_class = 'logged-in' if logged_in else 'logged-out'
+    return wrap_page('<section id="popular-films"><h2>Popular films this week</h2></section>', body_class)
+
+def films_menu_page(username):
+    """ The first page of a user's films, which includes the search options (genres, services, filters). """
+    genres = ''.join([f'<li><a class="item" href="/films/genre/{g}/">{g.title()}</a></li>' for g in GENRES])
+    services = ''.join([f'<li><a class="item" href="/{username}/films/on/{s}/">{s}</a></li>' for s in SERVICES])
+    filters = ''.join([
+        f'<li class="js-film-filter" data-category="{category}" data-type="{data_type}"><a href="#">{data_type} {category}</a></li>'
+        for category, data_types in FILTERS.items() for data_type in data_types])
+    body = (
+        f'<div class="sorting-selects"><ul class="genre-menu">{genres}</ul>'
+        f'<ul id="services-menu">{services}</ul><ul class="film-filters">{filters}</ul></div>'
+    )
+    return wrap_page(body, 'films-watched', username)
+
+
+"""
+** Film pages **
+"""
+def film_page(film):
+    """ The main page of a film. """
+    details = (
+        f'<div id="tab-details" class="tabbed-content-block">'
+        f'<h3><span>Studios</span></h3><div class="text-sluglist"><p><a href="/studio/studio-{film["id"]}/" class="text-slug">Studio</a></p></div>'
+        f'<h3><span>Country</span></h3><div class="text-sluglist"><p><a href="/films/country/{film["country"]}/" class="text-slug">{film["country"]}</a></p></div>'
+        f'<h3><span>Language</span></h3><div class="text-sluglist"><p><a href="/films/language/{film["language"]}/" class="text-slug">{film["language"]}</a></p></div>'
+        f'</div>'
+    )
+    genres = ''.join([f'<a href="/films/genre/{g}/" class="text-slug">{g}</a>' for g in film['genres']])
+    body = (
+        f'<div id="film-page-wrapper">'
+        f'<div class="film-poster" data-film-id="{film["id"]}" data-film-name="{escape(film["name"])}" '
+        f'data-film-release-year="{film["year"]}" data-poster-url="/film/{film["slug"]}/image-150/"></div>'
+        f'<section id="featured-film-header"><h1 class="headline-1">{escape(film["name"])}</h1></section>'
+        '<div class="review body-text">' + '<p>A synopsis of the film, which goes on for a while.</p>'*8 + '</div>'
+        '<div id="tabbed-content"><div id="tab-cast"><div class="cast-list text-sluglist">'
+        + ''.join([f'<a href="/actor/actor-{i}/" class="text-slug tooltip">Actor {i}</a>' for i in range(40)]) +
+        f'</div></div>{details}<div id="tab-genres"><h3><span>Genres</span></h3><div class="text-sluglist"><p>{genres}</p></div>'
+        f'<h3><span>Themes</span></h3><div class="text-sluglist"><p><a href="/films/theme/theme-1/" class="text-slug">Theme</a></p></div></div></div>'
+        f'<p class="text-link text-footer">{film["length"]}&nbsp;mins &nbsp; More details at <a href="https://www.imdb.com/">IMDB</a></p>'
+        f'</div>'
+    )
+    return wrap_page(body, 'film')
+
+def rating_histogram(film):
+    """ The fragment containing a film's rating histogram. """
+    counts = film['histogram']
+    total = sum(counts)
+    bars = ''
+    for i, count in enumerate(counts):
+        stars = (i+1)/2
+        if count:
+            bars += f'<li class="rating-histogram-bar" style="width: 15px; left: {i*16}px"><a href="/film/{film["slug"]}/ratings/rated/{stars}/" class="ir tooltip" title="{count:,} {stars}&#9733; ratings ({round(100*count/total)}%)">{count}</a></li>'
+        else:
+            bars += f'<li class="rating-histogram-bar" style="width: 15px; left: {i*16}px"><i style="height: 1px;"></i></li>'
+
+    if total < 30:
+        average = f'<span class="average-rating"><a href="/film/{film["slug"]}/ratings/" title="Not enough ratings to calculate average">&ndash;</a></span>'
+    else:
+        average = f'<span class="average-rating"><a href="/film/{film["slug"]}/ratings/" class="display-rating" title="Weighted average of 3.5 based on {total:,} ratings">3.5</a></span>'
+    return (
+        f'<section class="section ratings-histogram-chart"><h2 class="section-heading"><a href="/film/{film["slug"]}/ratings/">Ratings</a></h2>'
+        f'{average}<div class="rating-histogram clear rating-histogram-exploded"><ul>{bars}</ul></div></section>'
+    )
+
+def ratings_page(usernames_by_rating, page_num=1, last_page=1):
+    """ A page of a film's ratings, grouped by rating (10 -> 1). """
+    sections = ''
+    for rating, usernames in usernames_by_rating.items():
+        avatars = ''.join([f'<li class="listitem"><a class="avatar -a40" href="/{u}/"><img src="/avatar.png" alt="{u}" width="40" height="40"></a></li>' for u in usernames])
+        sections += (
+            f'<section class="film-ratings-group"><h2><span class="rating rated-large-{rating}">'
+            f'{"&#9733;" * (rating//2)}</span></h2><ul class="avatar-list">{avatars}</ul></section>'
+        )
+    return wrap_page(sections + pagination(page_num, last_page), 'film-ratings')
+
+
+"""
+** Searches **
+"""
+def search_page(films, num_films, page_num=1):
+    """ A page of films/ajax/popular/... The first page includes the heading with the number of films. """
+    heading = f'<h2 class="ui-block-heading">There are {num_films:,} films matching your filters</h2>' if page_num == 1 else ''
+    posters = ''.join([poster(f, li_class='listitem poster-container') for f in films])
+    return f'{heading}<ul class="poster-list -p70 -grid">{posters}</ul>'
+
+def watched_page(films, username, page_num=1, last_page=1):
+    """ A page of a user's watched films. """
+    posters = ''.join([poster(f) for f in films])
+    body = f'<ul class="poster-list -p70 -grid film-list clear">{posters}</ul>{pagination(page_num, last_page)}'
+    return wrap_page(body, 'films-watched', username)
+
+
+"""
+** Lists **
+"""
+def list_view_page(list_data, films, page_num=1, last_page=1):
+    """ A page of the view of a list. """
+    tags = ''.join([f'<li><a href="/tag/{t}/">{escape(t)}</a></li>' for t in list_data['tags']])
+    tags = f'<ul class="tags clear">{tags}</ul>' if tags else ''
+    offset = (page_num-1) * 100
+    posters = ''.join([poster(f, numbered=offset+i+1 if list_data['ranked'] else None) for i, f in enumerate(films)])
+    body = (
+        f'<meta property="og:title" content="{escape(list_data["name"])}">'
+        f'<meta name="description" content="{escape(list_data["description"])}">'
+        f'<div id="report-member-{list_data["username"]}-list-{list_data["list_id"]}" class="report-link"></div>'
+        f'<section class="list-title-intro"><h1 class="title-1">{escape(list_data["name"])}</h1>{tags}</section>'
+        f'<ul class="poster-list -p125 -grid film-list">{posters}</ul>{pagination(page_num, last_page)}'
+    )
+    return wrap_page(body, 'list-page', list_data['username'])
+
+def list_edit_page(list_data, entries):
+    """ The edit view of a list (owned by the user). """
+    tags = ''.join([f'<input type="hidden" name="tag" value="{escape(t)}">' for t in list_data['tags']])
+    public = ' checked' if list_data['public'] else ''
+    ranked = ' checked' if list_data['ranked'] else ''
+    items = ''
+    for entry in entries:
+        review = escape(entry.get('review', ''))
+        spoilers = 'true' if entry.get('containsSpoilers') else 'false'
+        items += (
+            f'<li class="film-list-entry" data-film-id="{entry["filmId"]}">'
+            f'<div class="poster film-poster"><img src="/empty.png" alt="Film"></div>'
+            f'<input type="hidden" name="review" value="{review}">'
+            f'<input type="hidden" name="containsSpoilers" value="{spoilers}">'
+            f'<a href="#" class="list-item-remove">Remove</a></li>'
+        )
+    body = (
+        f'<form id="list-edit-form"><input type="hidden" name="filmListId" value="{list_data["list_id"]}">'
+        f'<input type="text" name="name" value="{escape(list_data["name"])}">{tags}'
+        f'<input type="checkbox" id="list-is-public"{public}><input type="checkbox" id="show-item-numbers"{ranked}>'
+        f'<textarea name="notes">{escape(list_data["description"])}</textarea>'
+        f'<ul class="film-list">{items}</ul></form>'
+    )
+    return wrap_page(body, 'lists-edit', list_data['username'])
+
+def comments_section(list_data, comments):
+    """ The fragment containing the comments on a list. """
+    items = ''.join([
+        f'<li id="comment-{c["id"]}" class="comment" data-person="{c["username"]}" data-creation-timestamp="{c["timestamp"]}000">'
+        f'<div class="comment-body body-text" data-full-text-url="/s/full-text/comment:{c["id"]}/"><p>{escape(c["comment"][:100])}</p></div></li>'
+        for c in comments])
+    count = f'{len(comments)} comment{"s" if len(comments) != 1 else ""}'
+    return (
+        f'<h2 class="section-heading" data-comments-link="/{list_data["username"].lower()}/list/{list_data["slug"]}/#comments">{count}</h2>'
+        f'<div class="body"><ul class="comment-list">{items}</ul></div>'
+    )
+
+
+"""
+** People **
+"""
+def people_page(usernames, page_num=1, last_page=1):
+    """ A page of a user's followers/following (or blocked users). """
+    rows = ''.join([
+        f'<tr><td class="table-person"><div class="person-summary"><a class="avatar -a40" href="/{u}/"><img src="/avatar.png" alt="{u}"></a>'
+        f'<h3 class="title-3"><a href="/{u}/" class="name">{u}</a></h3></div></td><td class="col-watched">10</td></tr>'
+        for u in usernames])
+    return wrap_page(f'<table class="person-table"><tbody>{rows}</tbody></table>{pagination(page_num, last_page)}', 'people')
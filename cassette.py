@@ -0,0 +1,153 @@
+"""
+    Records the requests made by the session to a cassette file, and replays them without the network.
+
+    This turns a real run (e.g. of Watched, FilmSearch or MyList.update) into a deterministic
+    run that can be repeated to check for performance regressions, or profiled offline.
+
+    To record:
+        SESSION.cassette = Cassette("data/cassettes/watched.jsonl.gz", mode='record')
+        Watched('username')()
+        SESSION.cassette.close()
+
+    To replay (with the original response times, or speed=10 for 10x faster, or speed=None for no waiting):
+        SESSION.cassette = Cassette("data/cassettes/watched.jsonl.gz", speed=1)
+        Watched('username')()
+"""
+
+# Imports
+import os
+import json
+import gzip
+import time
+import threading
+from datetime import timedelta
+from collections import deque
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+
+class Cassette():
+    """ A gzipped file of request/response pairs, one JSON object per line.
+
+    - Requests are matched by method, suburl, params, form data and filter cookies.
+    - If the same request was recorded more than once (e.g. the edit page of a list before and after
+      an update), the responses are replayed in the order they were recorded. The last is then repeated.
+    - Passwords, the __csrf token and cookies are never written to the cassette. """
+
+    ## Form data which is not part of the key, and is never recorded
+    ignored_data = ['__csrf', 'password']
+
+    ## Cookies that change the content of a page, and so must be part of the key
+    key_cookies = ['filmFilter']
+
+    ## Response headers which are kept
+    kept_headers = ['content-type', 'etag', 'last-modified', 'retry-after']
+
+    def __init__(self, path, mode='replay', speed=None):
+        """
+        Parameters:
+        - path (str) - the location of the cassette
+        - mode (str) - 'record' (overwrites any existing cassette) or 'replay'
+        - speed (float or None) - when replaying, each response is delayed by its original response time / speed.
+            e.g. 1 for the original timing, 10 to compress it tenfold, None to not wait at all
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Invalid mode: {mode}. Must be 'record' or 'replay'")
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be positive (or None)")
+
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.__lock = threading.Lock()
+
+        if mode == 'record':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.__file = gzip.open(path, 'wt', encoding='utf-8')
+        else:
+            self.__file = None
+            self.__interactions = self.load(path)
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tPath: {self.path}\tMode: {self.mode} >"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def close(self):
+        """ Finishes writing the cassette (if recording). """
+        with self.__lock:
+            if self.__file:
+                self.__file.close()
+                self.__file = None
+
+    @classmethod
+    def get_key(cls, method, suburl, params=None, data=None, cookies=None):
+        """ Returns the key a request is recorded under.
+        r-type: str """
+        data = {k:v for k,v in (data or {}).items() if k not in cls.ignored_data}
+        cookie_values = {name: cookies.get(name) for name in cls.key_cookies} if cookies else {}
+        return json.dumps([
+            method,
+            suburl.lstrip('/'),
+            sorted((params or {}).items()),
+            sorted(data.items()),
+            cookie_values
+        ], default=str)
+
+    @staticmethod
+    def load(path):
+        """ Reads the responses in a cassette, grouped by the key of their request.
+        r-type: dict of deques """
+        interactions = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                interaction = json.loads(line)
+                interactions.setdefault(interaction['key'], deque()).append(interaction)
+        return interactions
+
+    def record(self, method, suburl, response, params=None, data=None, cookies=None, **kwargs):
+        """ Writes a request and its response to the cassette. """
+        interaction = {
+            'key': self.get_key(method, suburl, params, data, cookies),
+            'elapsed': response.elapsed.total_seconds(),
+            'url': response.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k:v for k,v in response.headers.items() if k.lower() in self.kept_headers},
+            'encoding': response.encoding,
+            'body': response.content.decode(response.encoding or 'utf-8', errors='replace')
+        }
+        with self.__lock:
+            if not self.__file:
+                raise Exception("Cassette has been closed")
+            self.__file.write(json.dumps(interaction) + '\n')
+
+    def play(self, method, suburl, params=None, data=None, cookies=None, **kwargs):
+        """ Returns the recorded response to a request, after waiting for its (scaled) response time.
+        r-type: Response """
+        key = self.get_key(method, suburl, params, data, cookies)
+        with self.__lock:
+            if not (responses := self.__interactions.get(key)):
+                raise Exception(f"No recorded response for {method} {suburl}")
+            interaction = responses.popleft() if len(responses) > 1 else responses[0]
+
+        if self.speed:
+            time.sleep(interaction['elapsed'] / self.speed)
+
+        response = Response()
+        response.url = interaction['url']
+        response.status_code = interaction['status']
+        response.reason = interaction['reason']
+        response.headers = CaseInsensitiveDict(interaction['headers'])
+        response.encoding = interaction['encoding']
+        response._content = interaction['body'].encode(interaction['encoding'] or 'utf-8')
+        response.elapsed = timedelta(seconds=interaction['elapsed'])
+        return response
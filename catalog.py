@@ -0,0 +1,280 @@
+"""
+    A local catalog of films, kept between runs, so that films which come up again and again
+    (in searches, watched pages, lists and FilmInfo lookups) don't have to be requested each time.
+
+    Films are keyed by their id. Whatever is known about a film is merged into its row:
+    e.g. a search only gives the id, name and slug, whereas the film's page gives the rest.
+    The details (from the film page) and the histogram are each timestamped, and are
+    re-requested once older than their time to live.
+    (A histogram requested before its film's id is known is stored by its slug instead.)
+
+    The catalog is used by default. To use a different file, or to disable it:
+        catalog.set_catalog(Catalog("other/path.sqlite3"))
+        catalog.set_catalog(None)
+"""
+
+# Imports
+import os
+import json
+import sqlite3
+import logging
+import threading
+import pendulum
+
+
+class Catalog():
+    """ Stores what is known about each film in an SQLite database. """
+
+    ## Columns which hold lists/dicts, and so are stored as json
+    json_columns = ['genres', 'histogram']
+
+    ## Columns from the film page (see extract.film_details)
+    detail_columns = ['name', 'release_year', 'poster_url', 'language', 'country', 'genres', 'film_length']
+
+    def __init__(self, path="data/catalog.sqlite3", details_ttl=60*60*24*30, histogram_ttl=60*60*24):
+        """
+        Parameters:
+        - path (str) - the location of the database (created on first use)
+        - details_ttl (int) - seconds before the details from a film's page are re-requested
+        - histogram_ttl (int) - seconds before a film's rating histogram is re-requested
+        """
+        self.path = path
+        self.details_ttl = details_ttl
+        self.histogram_ttl = histogram_ttl
+        self.__connection = None
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tPath: {self.path} >"
+
+    @property
+    def connection(self):
+        """ The connection to the database, which is opened (and the table created) on first use. """
+        if self.__connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # Many small writes are made (one per page scraped), so don't wait for each to reach the disk
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS films (
+                    id INTEGER PRIMARY KEY,
+                    slug TEXT,
+                    name TEXT,
+                    release_year INTEGER,
+                    poster_url TEXT,
+                    language TEXT,
+                    country TEXT,
+                    genres TEXT,
+                    film_length INTEGER,
+                    histogram TEXT,
+                    details_fetched INTEGER,
+                    histogram_fetched INTEGER
+                )""")
+            connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS films_slug ON films (slug)")
+            # Histograms of films whose ids aren't known yet (see add_film)
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS histograms (
+                    slug TEXT PRIMARY KEY,
+                    histogram TEXT,
+                    histogram_fetched INTEGER
+                )""")
+            connection.commit()
+            self.__connection = connection
+        return self.__connection
+
+    def __query(self, sql, args=()):
+        """ Returns the rows of a query as dicts.
+        If the catalog can't be read, no rows are returned, so the films are requested instead.
+        r-type: list of dicts """
+        with self.__lock:
+            try:
+                cursor = self.connection.execute(sql, args)
+                columns = [i[0] for i in cursor.description]
+                rows = cursor.fetchall()
+            except sqlite3.Error as e:
+                logging.warning(f"Could not read from the catalog: {e!r}")
+                return []
+        films = []
+        for row in rows:
+            film = dict(zip(columns, row))
+            for column in self.json_columns:
+                if film.get(column) is not None:
+                    film[column] = json.loads(film[column])
+            films.append(film)
+        return films
+
+    """
+    ** Reading **
+    """
+    def get(self, film_id=None, slug=None):
+        """ Returns everything known about a film, given its id or slug.
+        r-type: dict (or None, if the film isn't in the catalog) """
+        if film_id is not None:
+            films = self.__query("SELECT * FROM films WHERE id = ?", (int(film_id),))
+        else:
+            films = self.__query("SELECT * FROM films WHERE slug = ?", (slug,))
+        return films[0] if films else None
+
+    def get_many(self, film_ids):
+        """ Returns everything known about each of the films (that are in the catalog).
+        r-type: dict {id: dict} """
+        film_ids = [int(i) for i in film_ids]
+        films = {}
+        # SQLite limits the number of variables in a query
+        for i in range(0, len(film_ids), 500):
+            chunk = film_ids[i:i+500]
+            placeholders = ','.join('?' * len(chunk))
+            films.update({f['id']: f for f in self.__query(f"SELECT * FROM films WHERE id IN ({placeholders})", chunk)})
+        return films
+
+    def get_names(self, film_ids):
+        """ Returns the names of the films whose names are known.
+        r-type: dict {id: name} """
+        return {k:v['name'] for k,v in self.get_many(film_ids).items() if v['name']}
+
+    def is_fresh(self, fetched, ttl):
+        """ Returns True if something fetched at the given timestamp is still within its ttl. """
+        return fetched is not None and fetched + ttl > pendulum.now().int_timestamp
+
+    def get_details(self, slug):
+        """ Returns the details from a film's page, if they were fetched within the details_ttl.
+        r-type: dict in the format of extract.film_details (or None) """
+        if not (film := self.get(slug=slug)) or not self.is_fresh(film['details_fetched'], self.details_ttl):
+            return None
+        details = {k: film[k] for k in self.detail_columns}
+        details['id'] = str(film['id'])
+        details['release_year'] = str(film['release_year']) if film['release_year'] else None
+        return details
+
+    def get_histogram(self, slug):
+        """ Returns a film's rating histogram, if it was fetched within the histogram_ttl.
+        r-type: tuple (bool - whether a fresh histogram was found, dict or None - the histogram) """
+        for film in [self.get(slug=slug)] + self.__query("SELECT * FROM histograms WHERE slug = ?", (slug,)):
+            if film and self.is_fresh(film['histogram_fetched'], self.histogram_ttl):
+                return True, film['histogram']
+        return False, None
+
+    """
+    ** Writing **
+    """
+    def add(self, films):
+        """ Merges what is known about some films into the catalog.
+        Only the values given (and not None) are changed, so partial information
+        (e.g. just the id and name, from a search) never overwrites what is already known.
+
+        Parameters:
+        - films (list of dicts) - each must have an 'id', and can have any of the other columns.
+            A 'histogram' key (even if None) marks the histogram as fetched,
+            and any detail column other than name marks the details as fetched
+        """
+        now = pendulum.now().int_timestamp
+        rows = []
+        for film in films:
+            if not film.get('id'):
+                continue
+            row = {k:v for k,v in film.items() if k in self.detail_columns + ['slug'] and v is not None}
+            for column in self.json_columns:
+                if column in row:
+                    row[column] = json.dumps(row[column])
+            if 'histogram' in film:
+                row['histogram'] = json.dumps(film['histogram'])
+                row['histogram_fetched'] = now
+            if any(k in film for k in self.detail_columns if k != 'name'):
+                row['details_fetched'] = now
+            row['id'] = int(film['id'])
+            rows.append(row)
+
+        # The catalog is only an aid, so a failure to write to it must never stop a scrape
+        with self.__lock:
+            try:
+                for row in rows:
+                    columns = list(row)
+                    if row.get('slug'):
+                        # Letterboxd sometimes moves a slug from one film to another
+                        self.connection.execute("UPDATE films SET slug = NULL WHERE slug = ? AND id != ?", (row['slug'], row['id']))
+                    updates = ', '.join([f"{c} = excluded.{c}" for c in columns if c != 'id'])
+                    conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+                    self.connection.execute(
+                        f"INSERT INTO films ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                        f"ON CONFLICT (id) {conflict}",
+                        [row[c] for c in columns]
+                    )
+                self.connection.commit()
+            except sqlite3.Error as e:
+                self.__rollback()
+                logging.warning(f"Could not add {len(rows)} films to the catalog: {e!r}")
+
+    def add_film(self, slug, details=None, histogram=None, histogram_fetched=False):
+        """ Stores what has been scraped from a film's pages.
+
+        Parameters:
+        - slug (str)
+        - details (dict or None) - as returned by extract.film_details
+        - histogram (dict or None) - as returned by extract.rating_histogram
+        - histogram_fetched (bool) - whether the histogram was requested (it may be None if the film has no ratings)
+        """
+        if not details and not (film := self.get(slug=slug)):
+            # Without the film's id, only the histogram can be stored (by slug)
+            if histogram_fetched:
+                self.__add_histogram(slug, histogram)
+            return
+        film = dict(details or {'id': film['id']}, slug=slug)
+        if histogram_fetched:
+            film['histogram'] = histogram
+        self.add([film])
+
+    def __rollback(self):
+        """ Undoes any uncommitted writes (if the database could be opened at all). """
+        if self.__connection is not None:
+            self.__connection.rollback()
+
+    def __add_histogram(self, slug, histogram):
+        """ Stores the histogram of a film whose id isn't known. """
+        with self.__lock:
+            try:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO histograms (slug, histogram, histogram_fetched) VALUES (?, ?, ?)",
+                    (slug, json.dumps(histogram), pendulum.now().int_timestamp)
+                )
+                self.connection.commit()
+            except sqlite3.Error as e:
+                self.__rollback()
+                logging.warning(f"Could not add the histogram of {slug} to the catalog: {e!r}")
+
+    def clear(self):
+        """ Removes every film from the catalog. """
+        with self.__lock:
+            self.connection.execute("DELETE FROM films")
+            self.connection.execute("DELETE FROM histograms")
+            self.connection.commit()
+
+
+## The catalog used by the scrapers (or None if disabled)
+CATALOG = Catalog()
+
+def set_catalog(catalog):
+    """ Changes the catalog used by the scrapers.
+    Parameters:
+    - catalog (Catalog or None) - None disables the catalog """
+    global CATALOG
+    CATALOG = catalog
+
+def get_catalog():
+    """ Returns the catalog currently used by the scrapers (or None if disabled). """
+    return CATALOG
+
+def slug_from_link(link):
+    """ Returns the slug of a film, given the link to it.
+    e.g. /film/black-swan/ -> black-swan
+    r-type: str or None """
+    if not link or '/film/' not in link:
+        return None
+    return link.split('/film/')[1].strip('/').split('/')[0]
+
+def add_posters_to_catalog(posters):
+    """ Adds the films from a page of posters (see extract.posters) to the catalog, if it's enabled.
+    This gives the id, slug and (on some pages) the name of each film. """
+    if CATALOG is None:
+        return
+    CATALOG.add([{'id': i['id'], 'slug': slug_from_link(i['link']), 'name': i['name']} for i in posters])
@@ -0,0 +1,130 @@
+"""
+    An ordered set of list entries, for combining lists of many thousands of films.
+
+    Entries are keyed by their filmId, so each set operation is a single pass over its inputs,
+    rather than a search through one list for every entry of another.
+    The order of the entries, and any notes (review, containsSpoilers) on them, are kept.
+
+    Example:
+        a = EntrySet(my_list.entries)
+        (a | other_list.entries) - EntrySet.from_ids([290472, 51568])
+"""
+
+
+class EntrySet():
+    """ The entries of a list, in order, with no two entries for the same film.
+    When entries for the same film are combined, the first one (and its notes) is kept. """
+
+    def __init__(self, entries=()):
+        """
+        Parameters:
+        - entries (iterable of dicts, or EntrySet) - e.g. {"filmId": 290472, "review": "...", "containsSpoilers": False}
+        """
+        self.__entries = {}
+        self.__add(entries)
+
+    def __add(self, entries):
+        """ Adds any entries for films not already in the set. """
+        if isinstance(entries, EntrySet):
+            # Already copied and keyed, so only the new films need to be added
+            for film_id, entry in entries.__entries.items():
+                self.__entries.setdefault(film_id, entry)
+            return
+        for entry in entries:
+            film_id = int(entry['filmId'])
+            if film_id not in self.__entries:
+                self.__entries[film_id] = dict(entry, filmId=film_id)
+
+    def __copy(self, entries):
+        """ Returns a new set of the given {filmId: entry} items (which must already be copied and keyed).
+        The entries are shared with self, but are never changed once in a set.
+        r-type: EntrySet """
+        result = self.__class__()
+        result.__entries = entries
+        return result
+
+    @classmethod
+    def from_ids(cls, film_ids):
+        """
+        :: Alternative Constructor ::
+        r-type: EntrySet """
+        return cls({'filmId': i} for i in film_ids)
+
+    @staticmethod
+    def get_ids(entries):
+        """ Returns the filmIds of some entries.
+        r-type: set or dict keys (of int) """
+        if isinstance(entries, EntrySet):
+            return entries.film_ids
+        return {int(i['filmId']) for i in entries}
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tEntries: {len(self)} >"
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __iter__(self):
+        return iter(self.__entries.values())
+
+    def __contains__(self, item):
+        """ item can be a filmId or an entry. """
+        film_id = item['filmId'] if isinstance(item, dict) else item
+        return int(film_id) in self.__entries
+
+    def __eq__(self, other):
+        """ Two sets are equal if they have the same entries (including notes), in any order. """
+        if not isinstance(other, EntrySet):
+            return NotImplemented
+        return self.__entries == other.__entries
+
+    @property
+    def film_ids(self):
+        """ r-type: dict keys (of int), in order """
+        return self.__entries.keys()
+
+    def to_list(self):
+        """ Returns the entries, in the form used by LetterboxdList.entries
+        r-type: list of dicts """
+        return [dict(i) for i in self.__entries.values()]
+
+    def without_notes(self):
+        """ Returns the same films, without any notes.
+        r-type: EntrySet """
+        return self.__copy({k: {'filmId': k} for k in self.__entries})
+
+    """
+    ** Set Operations **
+    Each takes any number of EntrySets or lists of entries.
+    The order of the result follows self, then the others in the order given.
+    """
+    def union(self, *others):
+        """ A | B - the entries in any of the sets.
+        r-type: EntrySet """
+        result = self.__copy(dict(self.__entries))
+        for other in others:
+            result.__add(other)
+        return result
+
+    def difference(self, *others):
+        """ A - B - the entries in self which aren't in any of the others.
+        r-type: EntrySet """
+        excluded = set().union(*[self.get_ids(i) for i in others])
+        return self.__copy({k:v for k,v in self.__entries.items() if k not in excluded})
+
+    def intersection(self, *others):
+        """ A & B - the entries in self which are in all of the others.
+        r-type: EntrySet """
+        others = [self.get_ids(i) for i in others]
+        return self.__copy({k:v for k,v in self.__entries.items() if all(k in i for i in others)})
+
+    def symmetric_difference(self, other):
+        """ A ^ B - the entries in either set, but not both.
+        r-type: EntrySet """
+        other = other if isinstance(other, EntrySet) else self.__class__(other)
+        return self.difference(other).union(other.difference(self))
+
+    __or__ = union
+    __sub__ = difference
+    __and__ = intersection
+    __xor__ = symmetric_difference
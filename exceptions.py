@@ -13,3 +13,10 @@ class LetterboxdException(Exception):
     """
     def __init__(self, msg=''):
         super().__init__(msg)
+
+class CircuitOpenException(Exception):
+    """ Raises if a request is refused because Letterboxd has been failing,
+    and the session is waiting for it to recover. 
+    """
+    def __init__(self, msg=''):
+        super().__init__(msg)
@@ -0,0 +1,360 @@
+"""
+    Extracts the data the scrapers need from each type of page.
+
+    There are two interchangeable backends:
+        - LxmlExtractor (default) - parses with lxml directly and finds elements using XPath.
+            This avoids building a full BeautifulSoup tree, which is the slowest part of scraping.
+        - SoupExtractor - the original BeautifulSoup approach.
+
+    Both take the text of a page and return the same results.
+    To change the backend used by the scrapers:
+        extract.set_backend('soup')
+"""
+
+# Imports
+import re
+from lxml import html as lxml_html
+from bs4 import BeautifulSoup as bs
+
+
+def has_class(name):
+    """ Returns an XPath condition which matches elements that have the given class
+    (like BeautifulSoup's class_ argument, which matches any one of an element's classes).
+    r-type: str """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def get_number(text):
+    """ Returns the first number (which may contain commas) in a string.
+    r-type: int """
+    return int(re.findall(r"[\d,]+", text)[0].replace(',', ''))
+
+
+class LxmlExtractor():
+    """ Extracts data from pages using lxml and XPath. """
+
+    name = 'lxml'
+
+    @staticmethod
+    def parse(text):
+        """ Returns the root element of a page, or None if the page is empty. """
+        if not text or not text.strip():
+            return None
+        return lxml_html.fromstring(text)
+
+    @staticmethod
+    def first(elements):
+        """ Returns the first element of an XPath result, or None. """
+        return elements[0] if elements else None
+
+    def posters(self, text):
+        """ Returns the data attributes of the film posters on a page
+        (e.g. a page of a search, or of a user's watched films).
+        r-type: list of dicts """
+        if (root := self.parse(text)) is None:
+            return []
+        posters = []
+        for li in root.xpath(f"//li[{has_class('listitem')} or {has_class('poster-container')}]"):
+            div = next(li.iter('div'))
+            posters.append({
+                'id': div.get('data-film-id'),
+                'name': div.get('data-film-name'),
+                'link': div.get('data-film-link') or div.get('data-target-link')
+            })
+        return posters
+
+    def num_films(self, text):
+        """ Returns the number of films in a search, from the heading of its first page.
+        r-type: int """
+        heading = self.first(self.parse(text).xpath(f"//h2[{has_class('ui-block-heading')}]"))
+        return get_number(heading.text_content())
+
+    def last_page(self, text):
+        """ Returns the number of the last page, using the pagination block of a page.
+        If there is no pagination block, there is only one page.
+        r-type: int """
+        if (root := self.parse(text)) is None:
+            return 1
+        if (pagination := self.first(root.xpath(f"//div[{has_class('pagination')}]"))) is None:
+            return 1
+        page_numbers = [i.text_content().strip() for i in pagination.xpath(f".//li[{has_class('paginate-page')}]")]
+        return max([int(i) for i in page_numbers if i.isdigit()], default=1)
+
+    def rating_histogram(self, text):
+        """ Returns the number of ratings for each score (0.5 to 5 stars)
+        from a film's rating histogram, and whether the film has too few ratings
+        to have been given an average rating by Letterboxd.
+        r-type: dict (or None, if the page is empty) """
+        if (root := self.parse(text)) is None or not root.text_content():
+            return None
+        bars = [self.first(i.xpath(".//a")) for i in root.xpath(f"//li[{has_class('rating-histogram-bar')}]")]
+        return {
+            'counts': [get_number(i.get('title')) if i is not None else 0 for i in bars],
+            'obscure': bool(root.xpath("//a[contains(@title, 'Not enough ratings')]"))
+        }
+
+    def raters(self, text, target_rating):
+        """ Returns the users on a page of a film's ratings who've given it the target_rating.
+        r-type: list (or None, if the page has no section for the target_rating) """
+        if (root := self.parse(text)) is None:
+            return None
+        if (rating_span := self.first(root.xpath(f"//span[{has_class(f'rated-large-{target_rating}')}]"))) is None:
+            return None
+        rating_group = rating_span.getparent().getparent()
+        return [i.get('href')[1:-1] for i in rating_group.xpath(f".//a[{has_class('avatar')}]")]
+
+    def people(self, text):
+        """ Returns the usernames on a followers/following/blocked page.
+        r-type: list """
+        if (root := self.parse(text)) is None:
+            return []
+        return [td.xpath(".//a")[0].get('href').replace('/', '') for td in root.xpath(f"//td[{has_class('table-person')}]")]
+
+    def film_details(self, text):
+        """ Returns the information about a film available on its main page.
+        r-type: dict """
+        wrapper = self.first(self.parse(text).xpath("//div[@id='film-page-wrapper']"))
+        info = wrapper.xpath(f".//div[{has_class('film-poster')}]")[0]
+
+        tab_details = wrapper.xpath(".//div[@id='tab-details']")[0]
+        language_string = tab_details.xpath(".//a[contains(@href, '/films/language/')]")[0].get('href')
+        country_string = tab_details.xpath(".//a[contains(@href, '/films/country/')]")[0].get('href')
+
+        tab_genres = wrapper.xpath(".//div[@id='tab-genres']")[0]
+        genre_links = tab_genres.xpath(f".//a[{has_class('text-slug')}][contains(@href, '/films/genre/')]")
+
+        footer = self.first(wrapper.xpath(f".//p[{has_class('text-link')} or {has_class('text-footer')}]"))
+
+        return {
+            'id': info.get('data-film-id'),
+            'name': info.get('data-film-name'),
+            'release_year': info.get('data-film-release-year'),
+            'poster_url': info.get('data-poster-url'),
+            'language': language_string.split('language/')[1][:-1],
+            'country': country_string.split('country/')[1][:-1],
+            'genres': [i.get('href').split('genre/')[1][:-1] for i in genre_links],
+            'film_length': get_number(footer.text_content()) if footer is not None and re.search(r"\d", footer.text_content()) else None
+        }
+
+    def list_entries(self, text):
+        """ Returns the entries on a page of the view of a list.
+        r-type: list of dicts """
+        if (root := self.parse(text)) is None:
+            return []
+        return self.poster_list_entries(self.first(root.xpath(f"//ul[{has_class('poster-list')}]")))
+
+    @staticmethod
+    def poster_list_entries(poster_list):
+        """ r-type: list of dicts """
+        if poster_list is None:
+            return []
+        return [{'filmId': int(i.get('data-film-id'))} for i in poster_list.xpath(".//div[@data-film-id]")]
+
+    def list_view(self, text):
+        """ Returns the attributes of a list from its (first) page.
+        r-type: dict """
+        root = self.parse(text)
+        list_id_string = root.xpath("//div[contains(@id, 'report')]")[0].get('id')
+        tags_ul = self.first(root.xpath(f"//ul[{has_class('tags')}]"))
+        poster_list = root.xpath(f"//ul[{has_class('poster-list')}]")[0]
+        entries = self.poster_list_entries(poster_list)
+        return {
+            'list_id': int(re.findall(r"-(\d+)$", list_id_string)[0]),
+            'username': self.first(root.xpath(f"//body[{has_class('list-page')}]")).get('data-owner'),
+            'name': root.xpath("//meta[@property='og:title']")[0].get('content'),
+            'tags': [i.text_content().strip() for i in tags_ul.xpath(".//li")] if tags_ul is not None else [],
+            'public': None,
+            'ranked': bool(entries) and bool(poster_list.xpath(f".//li[{has_class('numbered-list-item')}]")),
+            'description': root.xpath("//meta[@name='description']")[0].get('content'),
+            'entries': entries
+        }
+
+    def list_edit(self, text):
+        """ Returns the attributes of a list (owned by the user) from its edit page,
+        including the notes on each entry.
+        r-type: dict """
+        root = self.parse(text)
+        entries = []
+        for li in root.xpath(f"//li[{has_class('film-list-entry')}]"):
+            entry = {'filmId': int(li.get('data-film-id'))}
+            review = self.first(li.xpath(".//input[@name='review'][@value]"))
+            if review is not None and (notes := review.get('value')):
+                entry['review'] = notes
+                entry['containsSpoilers'] = bool(li.xpath(".//input[@name='containsSpoilers'][@value='true']"))
+            entries.append(entry)
+        return {
+            'list_id': int(root.xpath("//input[@name='filmListId']")[0].get('value')),
+            'username': self.first(root.xpath(f"//body[{has_class('lists-edit')}]")).get('data-owner'),
+            'name': root.xpath("//input[@name='name']")[0].get('value'),
+            'tags': [i.get('value') for i in root.xpath("//input[@name='tag']")],
+            'public': bool(root.xpath("//input[@id='list-is-public'][@checked]")),
+            'ranked': bool(root.xpath("//input[@id='show-item-numbers'][@checked]")),
+            'description': root.xpath("//textarea[@name='notes']")[0].text_content() or '',
+            'entries': entries
+        }
+
+
+class SoupExtractor():
+    """ Extracts data from pages using BeautifulSoup. """
+
+    name = 'soup'
+
+    @staticmethod
+    def parse(text):
+        """ Returns the soup of a page. """
+        return bs(text, 'lxml')
+
+    def posters(self, text):
+        """ Returns the data attributes of the film posters on a page
+        (e.g. a page of a search, or of a user's watched films).
+        r-type: list of dicts """
+        divs = [i.find('div') for i in self.parse(text).find_all('li', class_=['listitem', 'poster-container'])]
+        return [
+            {
+                'id': i.get('data-film-id'),
+                'name': i.get('data-film-name'),
+                'link': i.get('data-film-link') or i.get('data-target-link')
+            }
+            for i in divs]
+
+    def num_films(self, text):
+        """ Returns the number of films in a search, from the heading of its first page.
+        r-type: int """
+        h2_text = self.parse(text).find('h2', class_='ui-block-heading').text
+        return get_number(h2_text)
+
+    def last_page(self, text):
+        """ Returns the number of the last page, using the pagination block of a page.
+        If there is no pagination block, there is only one page.
+        r-type: int """
+        if not (page_navigator := self.parse(text).find('div', class_='pagination')):
+            return 1
+        page_numbers = [i.text.strip() for i in page_navigator.find_all('li', class_='paginate-page')]
+        return max([int(i) for i in page_numbers if i.isdigit()], default=1)
+
+    def rating_histogram(self, text):
+        """ Returns the number of ratings for each score (0.5 to 5 stars)
+        from a film's rating histogram, and whether the film has too few ratings
+        to have been given an average rating by Letterboxd.
+        r-type: dict (or None, if the page is empty) """
+        soup = self.parse(text)
+        if not soup.text:
+            return None
+        bars = [i.find('a') for i in soup.find_all('li', class_='rating-histogram-bar')]
+        return {
+            'counts': [get_number(i.get('title')) if i else 0 for i in bars],
+            'obscure': bool(soup.find('a', title=re.compile("Not enough ratings")))
+        }
+
+    def raters(self, text, target_rating):
+        """ Returns the users on a page of a film's ratings who've given it the target_rating.
+        r-type: list (or None, if the page has no section for the target_rating) """
+        if not (rating_span := self.parse(text).find('span', class_=f'rated-large-{target_rating}')):
+            return None
+        rating_group = rating_span.parent.parent
+        return [i.get('href')[1:-1] for i in rating_group.find_all('a', class_='avatar')]
+
+    def people(self, text):
+        """ Returns the usernames on a followers/following/blocked page.
+        r-type: list """
+        return [person.find('a').get('href').replace('/', '') for person in self.parse(text).find_all("td", class_="table-person")]
+
+    def film_details(self, text):
+        """ Returns the information about a film available on its main page.
+        r-type: dict """
+        page_wrapper = self.parse(text).find('div', id='film-page-wrapper')
+        info = page_wrapper.find('div', class_='film-poster')
+
+        tab_details = page_wrapper.find('div', id="tab-details")
+        language_string = str(tab_details.find('a', attrs={'href': re.compile("/films/language/")}).get('href'))
+        country_string = str(tab_details.find('a', attrs={'href': re.compile("/films/country/")}).get('href'))
+
+        tab_genres = page_wrapper.find('div', id="tab-genres")
+        genre_links = tab_genres.find_all('a', class_='text-slug', attrs={'href': re.compile('/films/genre/')})
+
+        footer = page_wrapper.find('p', class_=['text-link', 'text-footer'])
+
+        return {
+            'id': info.get('data-film-id'),
+            'name': info.get('data-film-name'),
+            'release_year': info.get('data-film-release-year'),
+            'poster_url': info.get('data-poster-url'),
+            'language': language_string.split('language/')[1][:-1],
+            'country': country_string.split('country/')[1][:-1],
+            'genres': [i.get('href').split('genre/')[1][:-1] for i in genre_links],
+            'film_length': get_number(footer.text) if footer and re.search(r"\d", footer.text) else None
+        }
+
+    def list_entries(self, text):
+        """ Returns the entries on a page of the view of a list.
+        r-type: list of dicts """
+        return self.poster_list_entries(self.parse(text).find('ul', class_='poster-list'))
+
+    @staticmethod
+    def poster_list_entries(poster_list):
+        """ r-type: list of dicts """
+        if poster_list is None:
+            return []
+        return [{'filmId': int(i.get('data-film-id'))} for i in poster_list.find_all('div', attrs={'data-film-id': True})]
+
+    def list_view(self, text):
+        """ Returns the attributes of a list from its (first) page.
+        r-type: dict """
+        soup = self.parse(text)
+        list_id_string = soup.select_one("div[id*=report]").get('id') # *= means: contains
+        tags_ul = soup.find('ul', class_='tags')
+        poster_list = soup.find('ul', class_='poster-list')
+        entries = self.poster_list_entries(poster_list)
+        return {
+            'list_id': int(re.findall(r"-(\d+)$", list_id_string)[0]),
+            'username': soup.find('body', class_='list-page').get('data-owner'),
+            'name': soup.find('meta', attrs={'property': 'og:title'}).get('content'),
+            'tags': [i.text.strip() for i in tags_ul.find_all('li')] if tags_ul else [],
+            'public': None,
+            'ranked': bool(entries) and bool(poster_list.find('li', class_='numbered-list-item')),
+            'description': soup.find('meta', attrs={'name': 'description'}).get('content'),
+            'entries': entries
+        }
+
+    def list_edit(self, text):
+        """ Returns the attributes of a list (owned by the user) from its edit page,
+        including the notes on each entry.
+        r-type: dict """
+        soup = self.parse(text)
+        entries = []
+        for li in soup.find_all('li', class_='film-list-entry'):
+            entry = {'filmId': int(li.get('data-film-id'))}
+            review = li.find('input', attrs={'name': 'review', 'value': True})
+            if review and (notes := review.get('value')):
+                entry['review'] = notes
+                entry['containsSpoilers'] = bool(li.find('input', attrs={'name': 'containsSpoilers', 'value': 'true'}))
+            entries.append(entry)
+        return {
+            'list_id': int(soup.find('input', attrs={'name': 'filmListId'}).get('value')),
+            'username': soup.find('body', class_='lists-edit').get('data-owner'),
+            'name': soup.find('input', attrs={'name': 'name'}).get('value'),
+            'tags': [i.get('value') for i in soup.find_all('input', attrs={'name': 'tag'})],
+            'public': bool(soup.find('input', attrs={'id': 'list-is-public', 'checked': True})),
+            'ranked': bool(soup.find('input', attrs={'id': 'show-item-numbers', 'checked': True})),
+            'description': soup.find('textarea', attrs={'name': 'notes'}).text or '',
+            'entries': entries
+        }
+
+
+## Available backends
+BACKENDS = {i.name: i for i in (LxmlExtractor, SoupExtractor)}
+
+## The extractor used by the scrapers
+EXTRACTOR = LxmlExtractor()
+
+def set_backend(name):
+    """ Changes the extractor used by the scrapers.
+    Parameters:
+    - name (str) - e.g. 'lxml' or 'soup' """
+    global EXTRACTOR
+    if name not in BACKENDS:
+        raise ValueError(f"Invalid backend: {name}. Must be one of {list(BACKENDS)}")
+    EXTRACTOR = BACKENDS[name]()
+
+def get_extractor():
+    """ Returns the extractor currently used by the scrapers. """
+    return EXTRACTOR
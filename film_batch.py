@@ -0,0 +1,169 @@
+"""
+    For loading the information about many films at once, e.g. for analytics.
+
+    Rather than creating a FilmInfo for each film, the pages of every film are requested concurrently
+    (unless the film catalog has fresh results for them), parsed straight away, and the results
+    are stored as columns. The rating histograms form an N x 10 matrix, so averages, totals
+    and obscurity are computed for the whole batch at once.
+
+    Requires numpy (pip install numpy).
+
+    Example:
+        batch = FilmBatch.load(['black-swan', 'coherence', 'triangle'], max_workers=8)
+        batch.names[batch.avg_ratings > 7]
+"""
+
+# Imports
+import numpy as np
+
+# Local Imports
+from session import SESSION
+from extract import get_extractor
+from catalog import get_catalog
+import util
+
+
+class FilmBatch():
+    """ The information about a batch of films, in columns.
+    Row i of every column is about the film slugs[i].
+
+    Columns:
+    - slugs, names, languages, countries (arrays of str)
+    - ids, years (arrays of int; a year of 0 means unknown)
+    - genres (array of tuples of str)
+    - counts (N x 10 array of int) - the number of ratings of each score (0.5 to 5 stars)
+    - obscure_flags (array of bool) - whether Letterboxd showed "Not enough ratings"
+    """
+
+    ## The score (out of 10) of each column of counts
+    scores = np.arange(1, 11)
+
+    def __init__(self, rows, failed=None):
+        """
+        Parameters:
+        - rows (list of dicts) - as returned by load_film()
+        - failed (dict) - the films that could not be loaded {slug: exception}
+            Films whose histograms don't have exactly 10 bars are added to it, rather than the columns
+        """
+        self.failed = dict(failed or {})
+        valid_rows = []
+        for r in rows:
+            if r['histogram'] and (bars := len(r['histogram']['counts'])) != len(self.scores):
+                self.failed[r['slug']] = Exception(f"Expected {len(self.scores)} bars in the rating histogram, not {bars}")
+            else:
+                valid_rows.append(r)
+        rows = valid_rows
+
+        self.slugs = np.array([r['slug'] for r in rows], dtype=object)
+        self.ids = np.array([int(r['id']) if r['id'] else 0 for r in rows], dtype=np.int64)
+        self.names = np.array([r['name'] for r in rows], dtype=object)
+        self.years = np.array([int(r['release_year']) if r['release_year'] else 0 for r in rows], dtype=np.int32)
+        self.languages = np.array([r['language'] for r in rows], dtype=object)
+        self.countries = np.array([r['country'] for r in rows], dtype=object)
+        self.genres = np.empty(len(rows), dtype=object)
+        self.genres[:] = [tuple(r['genres']) for r in rows]
+
+        self.counts = np.zeros((len(rows), 10), dtype=np.int64)
+        self.obscure_flags = np.zeros(len(rows), dtype=bool)
+        for i, r in enumerate(rows):
+            if r['histogram']:
+                self.counts[i] = r['histogram']['counts']
+                self.obscure_flags[i] = r['histogram']['obscure']
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tFilms: {len(self)}\tFailed: {len(self.failed)} >"
+
+    def __len__(self):
+        return len(self.slugs)
+
+    """
+    ** Loading **
+    """
+    @classmethod
+    def load(cls, slugs, max_workers=8, histogram_only=False):
+        """
+        :: Alternative Constructor ::
+
+        Requests the pages of each film, up to max_workers at a time.
+        Films that fail to load are left out, and recorded in failed.
+
+        Parameters:
+        - slugs (iterable of str) - the paths of the films on Letterboxd, e.g. black-swan
+        - max_workers (int) - the number of films loaded at once
+        - histogram_only (bool) - if True, only the rating histograms are requested
+            (the name, year, etc. columns are left empty)
+        """
+        slugs = list(slugs)
+        rows, failed = [], {}
+        load = lambda slug: cls.load_film(slug, histogram_only)
+        for slug, result in zip(slugs, util.concurrent_imap(load, slugs, max_workers)):
+            if isinstance(result, Exception):
+                failed[slug] = result
+            else:
+                rows.append(result)
+        return cls(rows, failed)
+
+    @staticmethod
+    def load_film(slug, histogram_only=False):
+        """ Requests and parses the pages of a single film.
+        Any exception is returned (rather than raised) so that it doesn't stop the rest of the batch.
+        r-type: dict (or Exception) """
+        extractor, catalog = get_extractor(), get_catalog()
+        try:
+            if histogram_only:
+                details = dict.fromkeys(['id', 'name', 'release_year', 'language', 'country'], None)
+                details['genres'] = []
+            elif not catalog or not (details := catalog.get_details(slug)):
+                details = extractor.film_details(SESSION.request("GET", f"film/{slug}/").text)
+                if catalog:
+                    catalog.add_film(slug, details=details)
+
+            found, histogram = catalog.get_histogram(slug) if catalog else (False, None)
+            if not found:
+                histogram = extractor.rating_histogram(SESSION.request("GET", f"csi/film/{slug}/rating-histogram/").text)
+                if catalog:
+                    catalog.add_film(slug, histogram=histogram, histogram_fetched=True)
+            return dict(details, slug=slug, histogram=histogram)
+        except Exception as e:
+            return e
+
+    """
+    ** Ratings **
+    """
+    @property
+    def total_ratings(self):
+        """ The total number of ratings of each film.
+        r-type: array of int """
+        return self.counts.sum(axis=1)
+
+    @property
+    def avg_ratings(self):
+        """ The average rating (out of 10) of each film, or nan if it has no ratings.
+        r-type: array of float """
+        totals = self.total_ratings
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(totals > 0, self.counts @ self.scores / totals, np.nan)
+
+    @property
+    def is_obscure(self):
+        """ Whether each film has too few ratings to be given a rating by Letterboxd
+        (films with no ratings at all are obscure).
+        r-type: array of bool """
+        return self.obscure_flags | (self.total_ratings == 0)
+
+    def to_dict(self):
+        """ Returns every column, including the computed ones.
+        r-type: dict of arrays """
+        return {
+            'slug': self.slugs,
+            'id': self.ids,
+            'name': self.names,
+            'year': self.years,
+            'language': self.languages,
+            'country': self.countries,
+            'genres': self.genres,
+            'counts': self.counts,
+            'total_ratings': self.total_ratings,
+            'avg_rating': self.avg_ratings,
+            'is_obscure': self.is_obscure
+        }
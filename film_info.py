@@ -3,61 +3,90 @@
 """
 
 # Import
-import re
 import json
 
 # Local Imports
-from session import SESSION, make_soup
+from session import SESSION
+from extract import get_extractor
+from catalog import get_catalog
 
 
 class FilmInfo():
-    """ For getting information about a given film on Letterboxd. """
+    """ For getting information about a given film on Letterboxd. 
+    
+    The information is on two pages: the film's main page, and its rating histogram.
+    Each page is only requested when one of its attributes is first accessed,
+    and the parsed results are kept on the instance. 
+    Pages are only requested if the film catalog doesn't have a fresh copy of their results. """
+
+    ## Attributes taken from the film's main page
+    details = ['id_', 'name', 'release_year', 'poster_url', 'language', 'country', 'genres']
 
-    def __init__(self, film_path):
+    def __init__(self, film_path, histogram_only=False):
         """
         Parameters:
         - film_path (str) - the path to the film on Letterboxd.
             e.g. black-swan
+        - histogram_only (bool) - if True, the rating histogram is requested straight away,
+            and the film's main page is never requested (so only the rating attributes are available).
+            e.g. for checking whether films are obscure, at half the number of requests
         """
         self.path = film_path
+        self.histogram_only = histogram_only
 
-        # Film page
-        self.page_wrapper = self.__get_info_soup()
-        self.__get_film_info()
+        # Parsed results, set the first time they're needed
+        self.__details = None
+        self.__histogram = None
+        self.__histogram_loaded = False
+        self.__ratings = None
 
-        # Ratings are stored on a separate page
-        # So a second request is necessesary
-        self.rating_soup = self.__get_rating_soup()
+        if histogram_only:
+            self.histogram
 
     def __repr__(self):
         cls_name = self.__class__.__name__
         string = f"\tPath: {self.path}"
-        string += f"\tName: {self.name}"
+        if not self.histogram_only:
+            string += f"\tName: {self.name}"
         return f"< {cls_name}{string} >"
 
+    def __getattr__(self, attr):
+        """ Gets the attributes from the film's main page, requesting it if it hasn't been already. """
+        if attr not in self.details:
+            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{attr}'")
+        return self.__get_film_info()['id' if attr == 'id_' else attr]
+
     @property
     def suburl(self):
         """ Returns the suburl for this film
         Used for making the request to get film info. """
         return f"film/{self.path}/"
 
-    ## Soup getters
-
-    def __get_info_soup(self):
-        """ Go the main film_page and grab the soup. 
-        r-type: BeautifulSoup"""
-        request = SESSION.request("GET", self.suburl)
-        soup = make_soup(request)
-        page_wrapper = soup.find('div', id='film-page-wrapper')
-        return page_wrapper
+    ## Page getters
 
-    def __get_rating_soup(self):
+    @property
+    def histogram(self):
         """ The film's rating info is loaded from a different page
         Hence we make the request to this separate page to get it
-        r-type: BeautifulSoup """
-        suburl = f"csi/film/{self.path}/rating-histogram/"
-        request = SESSION.request("GET", suburl)
-        return make_soup(request)
+        r-type: dict (or None, if the film has no ratings page) """
+        if not self.__histogram_loaded:
+            catalog = get_catalog()
+            found, histogram = catalog.get_histogram(self.path) if catalog else (False, None)
+            if not found:
+                suburl = f"csi/film/{self.path}/rating-histogram/"
+                request = SESSION.request("GET", suburl)
+                histogram = get_extractor().rating_histogram(request.text)
+                if catalog:
+                    catalog.add_film(self.path, histogram=histogram, histogram_fetched=True)
+            self.__histogram = histogram
+            self.__histogram_loaded = True
+        return self.__histogram
+
+    @histogram.setter
+    def histogram(self, histogram):
+        self.__histogram = histogram
+        self.__histogram_loaded = True
+        self.__ratings = None
 
     ## Info getters
 
@@ -70,36 +99,28 @@ class FilmInfo():
         - language
         - country
         - genre(s)
+        - film_length
 
-        r-type: None
-        All information is set to instance variables
+        r-type: dict
         """
-        # Info
-        info = self.page_wrapper.find('div', class_='film-poster')
-        self.id_ = info.get('data-film-id')
-        self.name = info.get('data-film-name')
-        self.release_year = info.get('data-film-release-year')
-        self.poster_url = info.get('data-poster-url')
-
-        ## Details
-        tab_details = self.page_wrapper.find('div', id="tab-details")
-        language_string = str(tab_details.find('a', attrs={'href': re.compile("/films/language/")}).get('href'))
-        country_string = str(tab_details.find('a', attrs={'href': re.compile("/films/country/")}).get('href'))
-        self.language = language_string.split('language/')[1][:-1]
-        self.country = country_string.split('country/')[1][:-1]
-
-        ## Genres
-        tab_genres = self.page_wrapper.find('div', id="tab-genres")
-        genre_links = tab_genres.find_all('a', class_='text-slug', attrs={'href': re.compile('/films/genre/')})
-        self.genres = [i.get('href').split('genre/')[1][:-1] for i in genre_links]
+        if self.__details is None:
+            if self.histogram_only:
+                raise Exception(f"Film page not available for {self.path}; FilmInfo created with histogram_only=True")
+            catalog = get_catalog()
+            if not catalog or not (details := catalog.get_details(self.path)):
+                request = SESSION.request("GET", self.suburl)
+                details = get_extractor().film_details(request.text)
+                if catalog:
+                    catalog.add_film(self.path, details=details)
+            self.__details = details
+        return self.__details
 
     @property
     def film_length(self):
-        """ Uses the page wrapper to grab the film_length. """
-        footer = self.page_wrapper.find('p', class_=['text-link', 'text-footer'])
-        text = footer.text
-        film_length = re.findall(r"([\d,]+)", text)[0]
-        return int(film_length)
+        """ The film_length (in minutes), taken from the footer of the film's page. """
+        if (film_length := self.__get_film_info()['film_length']) is None:
+            raise ValueError(f"Could not get film_length for film: {self.path}")
+        return film_length
 
     ## Rating getters
 
@@ -109,22 +130,16 @@ class FilmInfo():
         number of times they have rated a film each score between 0.5 and 5.0
         Returns a dict of each score and the corresponding the user has rated that score.
         r-type: dict. """
-        if not self.rating_soup.text:
-            return None
+        if self.__ratings is not None or not self.histogram:
+            return self.__ratings
 
-        """ There are 10 li tags, 1 for each score 0.5 -> 5
-        Within these li tags, there is a link provided that the user has rated >1 film with that rating. """
-        ratings_data = [i.find('a') for i in self.rating_soup.find_all('li', class_='rating-histogram-bar')]
-        if len(ratings_data) != 10:
-            raise ValueError("Number of possible rating scores should be 10, not", len(ratings_data))
-        
-        """ This link has an attribute 'title', at the start of which is the value for the number 
-        of times the user has rated a movie that score. """
-        score_count_pattern = r"[\d,]+"
-        get_quantity = lambda x: int(re.findall(score_count_pattern, x.get('title'))[0].replace(',', '')) if x else 0
-        score_quantities = [get_quantity(i) for i in ratings_data]
+        """ There are 10 bars in the histogram, 1 for each score 0.5 -> 5 """
+        score_quantities = self.histogram['counts']
+        if len(score_quantities) != 10:
+            raise ValueError("Number of possible rating scores should be 10, not", len(score_quantities))
 
-        return {score+1: quantity for score, quantity in enumerate(score_quantities)} # {0.5: 44, 1.0: 108... 5.0: 91}
+        self.__ratings = {score+1: quantity for score, quantity in enumerate(score_quantities)} # {0.5: 44, 1.0: 108... 5.0: 91}
+        return self.__ratings
 
     def get_total_ratings(self, rating=None):
         """ Returns the total number of ratings. 
@@ -134,28 +149,28 @@ class FilmInfo():
         Parameters:
         - rating (int) - e.g. 4 -> returns count of ratings that are 2/5 aka 4/10
         r-type: int """
-        if not self.ratings:
+        if not (ratings := self.ratings):
             return 0
         elif not rating:
-            return sum(self.ratings.values())
-        return self.ratings[rating]
+            return sum(ratings.values())
+        return ratings[rating]
 
     def get_avg_rating(self, round_to=2):
         """ Computes the average of the ratings collected in self.ratings.
         r-type: float """
-        if not self.ratings:
+        if not (ratings := self.ratings):
             return None
-        pre_rounded_score = sum([s*q for s,q in self.ratings.items()])/self.get_total_ratings()
+        pre_rounded_score = sum([s*q for s,q in ratings.items()])/sum(ratings.values())
         return round(pre_rounded_score, round_to)
 
     @property
     def is_obscure(self):
-        """ Checks the ratings soup to ensure that the film does not have enough ratings
+        """ Checks the ratings histogram to ensure that the film does not have enough ratings
         to be given a standard rating - otherwise creating an instance of this class
         is pointless because grabbing the standard rating would be easier. """
         if not self.ratings:
             return True
-        return bool(self.rating_soup.find('a', title=re.compile("Not enough ratings")))
+        return self.histogram['obscure']
 
     
 if __name__ == "__main__":
@@ -3,14 +3,17 @@
 """
 
 # Imports
-import re
+import asyncio
 
 # Debugging
 import logging
 logging.basicConfig(level=logging.WARNING)
 
 # Local Imports
-from session import SESSION, make_soup
+from session import SESSION
+from extract import get_extractor
+from catalog import add_posters_to_catalog
+import util
 
 class FilmSearch():
     """ Search for all the films (unless a page limit is specificed) for
@@ -39,26 +42,75 @@ class FilmSearch():
         self.decade = decade
         self.page_limit = page_limit
 
-    def __call__(self):
+        # The first page of the search gives both the number of pages, and the first page of films
+        # These are set by __get_first_page()
+        self.__num_pages = None
+        self.__first_page_films = None
+
+    def __call__(self, max_workers=1):
         """ Return film data as a list of dicts, each dict containing 'id' and 'link'
+
+        Parameters:
+        - max_workers (int) - the number of pages requested at once.
+            Pages are still returned in order, and requests are paced by the SESSION's rate_limiter.
         r-type: list of dicts """
-        page_num = 0
+        return list(self.iter_films(max_workers))
+
+    def iter_films(self, max_workers=1):
+        """ The generator equivalent of __call__(). 
+        Yields the film data (dicts) as each page arrives, so the results can be used
+        before the search has finished, and the search can be stopped early. 
+        r-type: generator """
         suburl = self.suburl
-        film_data = []
 
-        # Identify stopping point for while loop
+        # Use the films from the first page, if it was already requested in order to get num_pages
+        # NOTE: these are only used once, so that calling the search again gives fresh results
+        if (first_page_films := self.__first_page_films) is None:
+            first_page_films = self.__get_first_page()
+        self.__first_page_films = None
+
+        # Identify stopping point
         pages_to_scrape = self.num_pages if not self.page_limit else min(self.num_pages, self.page_limit)
 
         logging.debug(f"Scraping data\nGenre: {self.genre}\nDecade: {self.decade}\nYear: {self.year}\n Pages {pages_to_scrape}")
-        
-        ## Commence scraping
-        while page_num < pages_to_scrape:
-            page_num += 1
+
+        def get_page(page_num):
+            """ Returns the film data on a given page of the search. """
             logging.debug(f"Attempting to scrape data from page {page_num}")
             request = SESSION.request("GET", f"{suburl}page/{page_num}/")
-            soup = make_soup(request) 
-            film_data += self.get_page_of_films(soup)
+            return self.get_page_of_films(request.text)
+        
+        ## Commence scraping
+        yield from first_page_films
+        for page in util.concurrent_imap(get_page, range(2, pages_to_scrape+1), max_workers):
+            yield from page
+
+    async def async_call(self, session=None):
+        """ The async equivalent of __call__(). 
+        After finding the number of pages, they are all requested concurrently.
+
+        Parameters:
+        - session (AsyncLetterboxdSession or None) - if None, a session is created for this call
+        r-type: list of dicts """
+        if session is None:
+            # Imported here so that httpx is only required when using async
+            from async_session import AsyncLetterboxdSession
+            async with AsyncLetterboxdSession() as session:
+                return await self.async_call(session)
+
+        suburl = self.suburl
+        response = await session.request("GET", suburl)
+        self.__num_pages = self.get_num_pages(response.text)
+        pages_to_scrape = self.num_pages if not self.page_limit else min(self.num_pages, self.page_limit)
+
+        responses = await asyncio.gather(*[
+            session.request("GET", f"{suburl}page/{page_num}/") 
+            for page_num in range(2, pages_to_scrape+1)
+        ])
 
+        film_data = self.get_page_of_films(response.text)
+        for response in responses:
+            film_data += self.get_page_of_films(response.text)
         return film_data
 
     @property
@@ -86,26 +138,35 @@ class FilmSearch():
     @property
     def num_pages(self):
         """ Return the number of pages in the selected search.
+        This is only requested once per instance, unless the search is called again.
         r-type: int """
+        if self.__num_pages is None:
+            self.__first_page_films = self.__get_first_page()
+        return self.__num_pages
+
+    def __get_first_page(self):
+        """ Requests the first page of the search, setting the number of pages,
+        and returning the film data on that page.
+        r-type: list of dicts """
         request = SESSION.request("GET", self.suburl)
-        soup = make_soup(request)
+        self.__num_pages = self.get_num_pages(request.text)
+        return self.get_page_of_films(request.text)
 
-        h2_text = soup.find('h2', class_='ui-block-heading').text
-        num_films = int(re.findall(r"([\d,]+)", h2_text)[0].replace(',', ''))
+    @staticmethod
+    def get_num_pages(page):
+        """ Return the number of pages, given the html of the first page of a search.
+        r-type: int """
+        num_films = get_extractor().num_films(page)
         num_pages = num_films//72+1
         return num_pages
 
     @staticmethod
-    def get_page_of_films(soup):
-        """ Return a list of dictionaries containing film data for a single page.
+    def get_page_of_films(page):
+        """ Return a list of dictionaries containing film data for a single page, given its html.
         r-type: list of dicts """
-        divs = [i.find('div') for i in soup.find_all('li', class_=['listitem', 'poster-container'])]
-
-        # NOTE This is unused code for getting links
-        # link_name_getter = lambda x: re.findall(r"/film/([\w\d:-]+)/", x)[0] # NOTE digits are necessesary e.g. /film/boat-2009/
-        # films = [ {'filmId': int(i.get('data-film-id')), 'link': link_name_getter(i.get('data-film-link'))} for i in divs ]
-        
-        films = [ {'filmId': int(i.get('data-film-id'))} for i in divs ] 
+        posters = get_extractor().posters(page)
+        add_posters_to_catalog(posters)
+        films = [ {'filmId': int(i['id'])} for i in posters ] 
         return films
 
     
@@ -9,12 +9,19 @@
 
 # Imports
 import re
+import hashlib
 import pendulum
+import threading
+from types import MappingProxyType
 
 # Local Imports
 from session import SESSION, make_soup
 import util
 from exceptions import LetterboxdException
+from catalog import get_catalog, add_posters_to_catalog
+from extract import get_extractor
+from film_info import FilmInfo
+from entry_set import EntrySet
 
 import itertools
 
@@ -29,6 +36,52 @@ import itertools
     # TODO: order films alphabetically
 
 
+class ListSnapshot():
+    """ The attributes of a list, as they were when the list was loaded.
+    The page is parsed once (see extract.list_view and extract.list_edit), and the page itself is not kept.
+
+    Snapshots cannot be changed; use replace() to get a snapshot with some attributes changed. """
+
+    __slots__ = ('list_id', 'username', 'name', 'tags', 'public', 'ranked', 'description', 'entries')
+
+    def __init__(self, list_id, username, name, tags, public, ranked, description, entries):
+        """
+        Parameters:
+        - list_id (int)
+        - username (str)
+        - name (str)
+        - tags (list of str)
+        - public (bool or None) - None if unknown (it's only shown on the edit page)
+        - ranked (bool)
+        - description (str)
+        - entries (list of dicts) - e.g. {"filmId": 290472}; stored as a tuple of read-only mappings
+        """
+        values = dict(
+            list_id=list_id, username=username, name=name, tags=tuple(tags), public=public,
+            ranked=ranked, description=description, entries=tuple(MappingProxyType(dict(i)) for i in entries)
+        )
+        for k,v in values.items():
+            object.__setattr__(self, k, v)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} cannot be changed; use replace()")
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tName: {self.name}\tEntries: {len(self.entries)} >"
+
+    def __eq__(self, other):
+        return isinstance(other, ListSnapshot) and self.as_dict() == other.as_dict()
+
+    def as_dict(self):
+        """ r-type: dict """
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def replace(self, **changes):
+        """ Returns a copy of the snapshot, with the given attributes changed.
+        r-type: ListSnapshot """
+        return self.__class__(**dict(self.as_dict(), **changes))
+
+
 class LetterboxdList():
     """ A list in Letterboxd. 
     For lists owned by user, use MyList for ability to modify/delete, etc. """
@@ -60,14 +113,12 @@ class LetterboxdList():
 
     def __len__(self):
         """ Returns the number of entries in the list. """
-        if not self.entries:
-            return 0
-        return len(self.entries)
+        return len(self.snapshot.entries)
 
     def __add__(self, other):
-        entries = self.entries
-        entries.update(other.entries)
-        return {'filmId': x for x in set(entries.values())}
+        """ Returns the entries in either list (without notes).
+        r-type: list of dicts """
+        return (EntrySet(self.entries_view) | other.entries_view).without_notes().to_list()
         
     def get_formatted_name(self):
         """ Produces a formatted_name based on self.name
@@ -88,15 +139,77 @@ class LetterboxdList():
         formatted_name = re.sub(" +", " ", formatted_name).strip()
         return formatted_name
 
+    ## The number of pages of a list requested at once
+    page_workers = 8
+
+    ## The snapshots of the most recently loaded lists, so that unchanged lists aren't parsed again
+    # {view_list: {'snapshot', 'etag', 'last_modified', 'digests'}}
+    # Any POST clears it (see below the class), as it may have changed a list
+    entries_cache = util.LRUCache(max_size=64)
+
     def load(self, username):
-        """ load an instance for an existing list, given its name. """
+        """ load an instance for an existing list, given its name.
+        Every page of the list is loaded (the pages after the first, concurrently),
+        unless the first page shows that the list hasn't changed since it was last loaded.
+        If Letterboxd gives no ETag/Last-Modified for the list, it's only taken to be unchanged
+        if every page is identical. """
         list_name = self.get_formatted_name()
         view_list = f"{username}/list/{list_name}/"
+        extractor = get_extractor()
+
+        # Make request to list url on Letterboxd, asking whether it's changed if it has been loaded before
+        cached = self.entries_cache.get(view_list)
+        headers = {}
+        if cached and cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached and cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+        response = SESSION.request("GET", view_list, headers=headers)
+        self.refresh_comments()
+
+        if self.__is_unchanged(cached, response):
+            self.snapshot = cached['snapshot']
+            return
 
-        # Make request to list url on Letterboxd
-        response = SESSION.request("GET", view_list)
-        soup = make_soup(response)
-        self.soup = soup
+        ## Load the rest of the pages
+        last_page = extractor.last_page(response.text)
+        pages = [response.text] + util.concurrent_map(
+            lambda page_num: SESSION.request("GET", f"{view_list}page/{page_num}/").text,
+            range(2, last_page+1), self.page_workers
+        )
+        digests = [hashlib.sha1(page.encode()).hexdigest() for page in pages]
+
+        if cached and digests == cached['digests']:
+            self.snapshot = cached['snapshot']
+        else:
+            def parse_page(page):
+                add_posters_to_catalog(extractor.posters(page))
+                return extractor.list_entries(page)
+
+            first_page = extractor.list_view(pages[0])
+            add_posters_to_catalog(extractor.posters(pages[0]))
+            entries = first_page['entries']
+            for page_entries in util.concurrent_imap(parse_page, pages[1:], self.page_workers):
+                entries += page_entries
+            self.snapshot = ListSnapshot(**dict(first_page, entries=entries))
+
+        self.entries_cache.set(view_list, {
+            'snapshot': self.snapshot,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'digests': digests
+        })
+
+    def __is_unchanged(self, cached, response):
+        """ Returns True if the ETag/Last-Modified of the first page of a list
+        show that it hasn't changed since it was cached.
+        r-type: bool """
+        if not cached:
+            return False
+        if response.status_code == 304:
+            return True
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        return bool(etag or last_modified) and (etag, last_modified) == (cached['etag'], cached['last_modified'])
 
     """
     ** Misc. **
@@ -108,20 +221,15 @@ class LetterboxdList():
     @property
     def data(self):
         """ Creates a dictionary of list attributes using the instance's properties
-        grabbed from the soup. """
-        try:
-            data_dict = {
-                'list_id': self._id,
-                'name': self.name,
-                'tags': self.tags,
-                'ranked': self.ranked,
-                'description': self.description,
-                'entries': self.entries
-            }
-        except Exception as e:
-            raise Exception(f"Could not get data\n{e}")
-        else:
-            return data_dict
+        taken from the snapshot. """
+        return {
+            'list_id': self._id,
+            'name': self.name,
+            'tags': self.tags,
+            'ranked': self.ranked,
+            'description': self.description,
+            'entries': self.entries
+        }
 
     """
     ** List Attributes **
@@ -132,21 +240,14 @@ class LetterboxdList():
         NOTE: the list_id cannot be set; it is assigned upon creation of the list. 
         r-type: int
         """
-        list_id_string = self.soup.select_one("div[id*=report]").get('id') # *= means: contains
-        pattern = r"-(\d+)$"
-        try:
-            match = int(re.findall(pattern, list_id_string)[0])
-        except IndexError:
-            raise Exception("Could not get id")
-        else:
-            return match
+        return self.snapshot.list_id
 
     @property
     def username(self):
         """ Returns the username of the person who owns the list.
         r-type: str 
         """
-        return self.soup.find('body', class_='list-page').get('data-owner')
+        return self.snapshot.username
 
     @property
     def name(self):
@@ -154,47 +255,41 @@ class LetterboxdList():
         This should correspond exactly with the name you used when creating the list. 
         r-type: str
         """
-        return self.soup.find('meta', attrs={'property': 'og:title'}).get('content')
+        return self.snapshot.name
 
     @property
     def tags(self):
         """ Returns the list of tags the list has.
         If the list has no tags, returns the empty list.
         r-type: list. """
-        if not (tags_ul := self.soup.find('ul', class_='tags')):
-            # The tags list could not be found - there are no tags
-            return []
-        tags_list = tags_ul.find_all('li')
-        return [i.text.strip() for i in tags_list]
+        return list(self.snapshot.tags)
 
     @property
     def ranked(self):
         """ Returns a bool value based on if the list is ranked.
         r-type: bool """
-        if not self.entries:
-            return False
-        entries_list = self.soup.find('ul', class_='poster-list')
-        numbered_entry = entries_list.find('li', class_='numbered-list-item')
-        return bool(numbered_entry)
+        return self.snapshot.ranked
 
     @property
     def description(self):
         """ Returns the list's description; keeps all whitespacing.
         r-type: str. """
-        return self.soup.find('meta', attrs={'name': 'description'}).get('content')
+        return self.snapshot.description
 
     @property
     def entries(self):
-        """ Returns the list's entries
-        NOTE: this also includes any notes that have been added for each film. 
+        """ Returns a copy of the list's entries, which can be changed freely.
+        NOTE: for MyList, this also includes any notes that have been added for each film. 
         r-type: list of dicts
         Example:
         {"filmId": 290472} """
+        return [dict(i) for i in self.snapshot.entries]
 
-        entry_list_items = self.soup.find('ul', class_='poster-list').find_all('div')
-
-        # Convert list to entries dict
-        return [{"filmId": int(i.get('data-film-id'))} for i in entry_list_items]
+    @property
+    def entries_view(self):
+        """ Returns the list's entries without copying them, for reading only.
+        r-type: tuple of read-only dicts (MappingProxyType) """
+        return self.snapshot.entries
 
     """
     ** Comment Manipulation **
@@ -204,25 +299,47 @@ class LetterboxdList():
         """ Returns the suburl for adding a comment to a list. """
         return f's/filmlist:{self._id}/add-comment'
     
+    ## The number of comment bodies requested at once
+    comment_workers = 8
+
+    def refresh_comments(self):
+        """ Discards the comments section, so that it's requested again the next time it's needed. """
+        self.__comment_soup = None
+
     @property
     def comment_soup(self):
-        """ Returns the soup containing information about the list's existing comments."""
-        response = SESSION.request(
-            "GET", f"csi/list/{self._id}/comments-section/?", 
-            params={'esiAllowUser': True}
-            )
-        soup = make_soup(response)
-        return soup
+        """ Returns the soup containing information about the list's existing comments.
+        It is requested once, and kept until the next refresh_comments() (or load). """
+        if self.__comment_soup is None:
+            response = SESSION.request(
+                "GET", f"csi/list/{self._id}/comments-section/?", 
+                params={'esiAllowUser': True}
+                )
+            self.__comment_soup = make_soup(response)
+        return self.__comment_soup
+
+    @property
+    def comment_items(self):
+        """ Returns the list items for the comments in the comments section
+        (not including any that have been removed). """
+        body = self.comment_soup.find('div', class_='body')
+        return [i for i in body.find_all('li', attrs={'data-person': True})]
 
     @property
     def comments(self):
         """ Returns a dictionary of comments on the list. 
         Example: [{'username': 'LostInStyle', 'comment': 'Hello World', 'date_created':2020-11-15}]
         """
-        body = self.comment_soup.find('div', class_='body')
-        valid_comments = [i for i in body.find_all('li', attrs={'data-person': True})]
-        
-        if not valid_comments:
+        return self.get_comments()
+
+    def get_comments(self, fetch_bodies=True):
+        """ Returns the comments on the list (see comments).
+        The full text of each comment is on a separate page; these are requested concurrently.
+
+        Parameters:
+        - fetch_bodies (bool) - if False, the full text is not requested, and 'comment' is None
+        r-type: list of dicts (or None, if there are no comments) """
+        if not (valid_comments := self.comment_items):
             return None
 
         def get_comment_text(suburl):
@@ -234,20 +351,27 @@ class LetterboxdList():
             """ Convert the timestamp 'data-creation-timestamp' into a valid pendulum timestamp. """
             return pendulum.from_timestamp(timestamp)
 
+        if fetch_bodies:
+            text_urls = [i.find('div', class_='comment-body').get('data-full-text-url') for i in valid_comments]
+            bodies = util.concurrent_map(get_comment_text, text_urls, self.comment_workers)
+        else:
+            bodies = [None] * len(valid_comments)
+
         comments = [
             {
             'id': int(i['id'].split('-')[1]),
             'username': i['data-person'],
             'date_created': convert_timestamp( int(i['data-creation-timestamp'][:-3]) ),
-            'comment': get_comment_text(i.find('div', class_='comment-body').get('data-full-text-url')),
+            'comment': body,
             }
-            for i in valid_comments]
+            for i, body in zip(valid_comments, bodies)]
         return comments
 
     @property
     def num_comments(self):
-        """ Returns the number of comments a list has received, not included any that have been removed. """
-        if not self.comments:
+        """ Returns the number of comments a list has received, not included any that have been removed. 
+        This only needs the comments section (not the body of each comment). """
+        if not self.comment_items:
             return 0
         data_comments_link = f"/{self.username.lower()}/list/{self.get_formatted_name()}/#comments"
         num_comments_text = self.comment_soup.find('h2', attrs={'data-comments-link': data_comments_link}).text.strip()
@@ -262,11 +386,12 @@ class LetterboxdList():
     def add_comment(self, comment):
         """ Adds a comment to the list. """
         SESSION.request("POST", self.add_comment_url, data={'comment': comment})
+        self.refresh_comments()
 
     def delete_comment(self, comment_id):
         """ Deletes a comment on a list, given that comment's id. """
         # Edge cases
-        if not (comments := self.comments):
+        if not (comments := self.get_comments(fetch_bodies=False)):
             raise Exception("No comments to delete!")
         if type(comment_id) not in (str, int):
             raise TypeError(f"Invalid type for comment_id: {type(comment_id)}. Should be int")
@@ -280,6 +405,7 @@ class LetterboxdList():
 
         # Make post request to delete comment
         SESSION.request("POST", suburl=delete_comment_url)
+        self.refresh_comments()
 
     """
     ** Film names **
@@ -293,35 +419,38 @@ class LetterboxdList():
         Example: {film_id: film_name}
         """
         response = SESSION.request("GET", f"{self.view_list}page/{page_num}/")
+        return self.__parse_film_names(response)
+
+    @staticmethod
+    def __parse_film_names(response):
+        """ Returns the {film_id: film_name} of the films on a page of a list, and adds them to the catalog. """
         soup = make_soup(response)
 
         ul = soup.find('ul', class_='film-list')
         page_results = {int(li.find('div').get('data-film-id')): li.find('img').get('alt') for li in ul.find_all('li')} 
+
+        if catalog := get_catalog():
+            catalog.add([{'id': k, 'name': v} for k,v in page_results.items()])
         return page_results
 
     def get_film_names(self):
-        """ Returns each id in the film list together with the corresponding film_name. """
+        """ Returns each id in the film list together with the corresponding film_name.
+        The pages after the first are requested concurrently. """
 
         response = SESSION.request("GET", self.view_list)
-        soup = make_soup(response)
+        last_page = get_extractor().last_page(response.text)
 
-        if not ( page_navigator := soup.find('div', class_='pagination') ):
-            last_page = 1
-        else:
-            last_page = int(page_navigator.find_all('li', class_='paginate-page')[-1].find('a').text)
-
-        current_page = 1
-        results = {}
-        while current_page <= last_page:
-            page_results = self.get_page_of_film_names(current_page)
-            if not page_results:
-                break
+        results = self.__parse_film_names(response)
+        for page_results in util.concurrent_imap(self.get_page_of_film_names, range(2, last_page+1), self.page_workers):
             results.update(page_results)
-            current_page += 1
 
         return results
 
 
+## A POST may have changed a list (e.g. by saving it), so the cached lists are dropped
+SESSION.post_listeners.append(LetterboxdList.entries_cache.clear)
+
+
 class MyList(LetterboxdList):
     """ Subclass for Letterboxd Lists owned by the user.
     
@@ -358,9 +487,9 @@ class MyList(LetterboxdList):
         Uses the edit view rather than standard list view. """
         list_name = self.get_formatted_name()
         edit_url = f"{SESSION.username}/list/{list_name}/edit"
-        request = SESSION.request("GET", edit_url)
-        soup = make_soup(request)
-        self.soup = soup
+        response = SESSION.request("GET", edit_url, login_required=True)
+        self.snapshot = ListSnapshot(**get_extractor().list_edit(response.text))
+        self.refresh_comments()
 
     """
     ** Misc **
@@ -396,21 +525,16 @@ class MyList(LetterboxdList):
     @property
     def data(self):
         """ Creates a dictionary of list attributes using the instance's properties
-        grabbed from the soup. """
-        try:
-            data_dict = {
-                'list_id': self._id,
-                'name': self.name,
-                'tags': self.tags,
-                'public': self.public,
-                'ranked': self.ranked,
-                'description': self.description,
-                'entries': self.entries
-            }
-        except Exception as e:
-            raise Exception(f"Could not get data\n{e}")
-        else:
-            return data_dict
+        taken from the snapshot. """
+        return {
+            'list_id': self._id,
+            'name': self.name,
+            'tags': self.tags,
+            'public': self.public,
+            'ranked': self.ranked,
+            'description': self.description,
+            'entries': self.entries
+        }
 
     """
     ** Alternative Constructors **
@@ -499,7 +623,7 @@ class MyList(LetterboxdList):
         """
         if not other.__class__.__name__ in ("MyList", "LetterboxdList"):
             raise TypeError("Other must be a LetterboxdList or MyList object to copy from")
-        return cls.new(name, entries=other.entries)
+        return cls.new(name, entries=EntrySet(other.entries_view).to_list())
 
     """
     ** List Manipulation **
@@ -507,39 +631,17 @@ class MyList(LetterboxdList):
     def __merge_entries(self, *entries_lists, keep_notes=True):
         """ Given a nested list in the form
         [Lblist.entries, Lblist.entries, Lblist.entries, ...]
-        Return the result of merging each list, keeping only filmId key, value pairs. """
+        Return the result of merging each list (in order, without duplicates).
+        If keep_notes is False, only the filmId key, value pairs are kept. 
+        r-type: EntrySet """
         # Edge cases
-        if not all( [isinstance(i, list) for i in entries_lists] ):
+        if not all( [isinstance(i, (list, tuple, EntrySet)) for i in entries_lists] ):
             raise TypeError(f"All arguments must be lists, not {entries_lists}")
         if not entries_lists:
             raise Exception("No arguments provided")
 
-        results = []
-        
-        if keep_notes:
-            [[results.append(entry) for entry in entries] for entries in entries_lists]
-            # must be a list of lists still somehow
-
-            unique_film_ids = set([i['filmId'] for i in results])
-            unique_results = []
-            for i in results:
-                if (film_id := i['filmId']) not in unique_film_ids:
-                    continue
-                unique_results.append(i)
-                unique_film_ids.remove(film_id)
-
-        else:
-            [[results.append(entry['filmId']) for entry in entries] for entries in entries_lists]
-
-            unique_film_ids = set(results)
-            unique_results = []
-            for i in results:
-                if i not in unique_film_ids:
-                    continue
-                unique_results.append({'filmId': i})
-                unique_film_ids.remove(i)
-
-        return unique_results
+        merged = EntrySet().union(*entries_lists)
+        return merged if keep_notes else merged.without_notes()
 
     def __show_changes(self, new_entries):
         """ Records the changes to a list in terms of film entries, by adding a comment
@@ -561,7 +663,7 @@ class MyList(LetterboxdList):
 
         ## Get only the film ids so that items can be compared w/out notes
         new = extract_ids(new_entries)
-        old = extract_ids(self.entries)
+        old = extract_ids(self.entries_view)
 
         ## If there are no changes, just return
         if set(new) == set(old):
@@ -573,9 +675,13 @@ class MyList(LetterboxdList):
         removed_ids = old - new
 
         ## Get the respective names
+        # (the films being removed are on this list, so any names not already known are taken from its pages)
         added_names = get_film_names(added_ids).values()
 
-        current_film_names = self.get_film_names()
+        catalog = get_catalog()
+        current_film_names = catalog.get_names(removed_ids) if catalog else {}
+        if any(k not in current_film_names for k in removed_ids):
+            current_film_names = self.get_film_names()
         removed_names = [current_film_names[k] for k in removed_ids]
 
         bolden = lambda x: f"<strong>{x}</strong>"
@@ -612,37 +718,81 @@ class MyList(LetterboxdList):
         if not util.yn("Are you sure you want to delete the list? This cannot be undone!"):
             return
         SESSION.request("POST", self.suburl_delete)
-        self.soup = None
+        self.snapshot = None
 
-    def update(self, show_changes=False, **kwargs):
+    @staticmethod
+    def normalise_entries(entries):
+        """ Converts entries to the form they take once saved (and as they're read from the edit view):
+        notes are only kept if non-empty, in which case they always have a containsSpoilers flag.
+        r-type: list of dicts """
+        normalised = []
+        for entry in entries:
+            film_id = int(entry['filmId'])
+            if not (notes := entry.get('review')):
+                normalised.append({'filmId': film_id})
+            else:
+                normalised.append({'filmId': film_id, 'review': notes, 'containsSpoilers': bool(entry.get('containsSpoilers'))})
+        return normalised
+
+    def get_changes(self, **kwargs):
+        """ Returns the attributes which differ from the snapshot, i.e. the changes
+        that update() would make if given the same keyword arguments.
+        r-type: dict """
+        current = self.data
+        if any(unknown_keys := [k for k in kwargs if k not in current.keys()]):
+            raise KeyError(f"Unknown keys: {unknown_keys}")
+
+        if 'entries' in kwargs:
+            kwargs['entries'] = self.normalise_entries(kwargs['entries'])
+        if 'tags' in kwargs:
+            kwargs['tags'] = list(kwargs['tags'])
+
+        return {k:v for k,v in kwargs.items() if v != current[k]}
+
+    def update(self, show_changes=False, reload=False, **kwargs):
         """ Modify one or more attributes of the list, including entries.
         It is called by methods which deal strictly with modifying entries,
-        namely replace, add and subtract. """
+        namely replace, add and subtract.
 
-        if any(unknown_keys := [k for k in kwargs if k not in self.data.keys()]):
-            raise KeyError(f"Unknown keys: {unknown_keys}")
+        Only the attributes which differ from the snapshot count as changes.
+        If there are none, no request is made. Otherwise, the list is saved
+        and the changes are applied to the snapshot, rather than requesting the edit view again.
+
+        Parameters:
+        - show_changes (bool) - if True, adds a comment to the list showing the films added/removed
+        - reload (bool) - if True, the edit view is requested again after saving
+            (e.g. to pick up any changes Letterboxd makes to the values given)
+
+        r-type: bool - whether the list was saved
+        """
+        if not (changes := self.get_changes(**kwargs)):
+            return False
 
-        new_attrs = {k:v if k not in kwargs else kwargs[k] for k,v in self.data.items()}
+        new_attrs = dict(self.data, **changes)
 
-        if show_changes and 'entries' in new_attrs.keys():
+        if show_changes and 'entries' in changes:
             self.__show_changes(new_attrs['entries'])
 
         ## Convert the data into post_data for request to update list on Letterbox 
         post_data = self.make_post_data(new_attrs)
 
         # Make post request to update data
-        r = SESSION.request(
+        SESSION.request(
             "POST",
             suburl=self.save_url,
             data=post_data
         )
 
         ## Update user-defined name to allow loading to work if list has been renamed
-        if 'name' in new_attrs: 
+        if 'name' in changes: 
             self.user_defined_name = new_attrs['name']
 
-        ## Make get request to update soup
-        self.load()
+        if reload:
+            self.load()
+        else:
+            # The save succeeded, so the list is now as was sent
+            self.snapshot = self.snapshot.replace(**changes)
+        return True
 
     def clear(self):
         """ 
@@ -659,29 +809,28 @@ class MyList(LetterboxdList):
         merged_others = self.__merge_entries(*args, keep_notes=False)
         
         # Update the list by replacing the current entries with the merged_others
-        self.update(entries=merged_others, show_changes=show_changes)
+        self.update(entries=merged_others.to_list(), show_changes=show_changes)
 
     def append(self, *args, show_changes=False):
         """ 
         A, B -> A + B
         Add to any existing entries with the passed list(s) of entries. """
-        current = self.entries
         merged_others = self.__merge_entries(*args, keep_notes=False)
 
-        combined = self.__merge_entries(*[current, merged_others], keep_notes=True)
-        self.update(entries=combined, show_changes=show_changes)
+        # The existing entries (and their notes) come first
+        combined = EntrySet(self.entries_view) | merged_others
+        self.update(entries=combined.to_list(), show_changes=show_changes)
 
     def remove(self, *args, show_changes=False):
         """
         A, B -> A - B
         Subtract passed list(s) of entries from any entries which exist in the list currently. """
-        current = self.entries
         merged_others = self.__merge_entries(*args, keep_notes=False)
 
         # Subtract the merged_others (other entries) from the existing entries
-        remaining = [i for i in current if i['filmId'] not in [j['filmId'] for j in merged_others]]
+        remaining = EntrySet(self.entries_view) - merged_others
 
-        self.update(entries=remaining, show_changes=show_changes)
+        self.update(entries=remaining.to_list(), show_changes=show_changes)
 
     """
     ** List Attributes **
@@ -690,74 +839,25 @@ class MyList(LetterboxdList):
     def public(self):
         """ Returns a bool value based on if the list is public.
         r-type: bool """
-        return bool(self.soup.find('input', attrs={'id': 'list-is-public', 'checked':True}))
+        return self.snapshot.public
 
     """ 
-    ** List Attributes (overloaded) **
-    
-    These properties have to be overloaded because, in MyList, we're working with
-    a different soup.
+    ** List Attributes (from the edit view) **
     
     Whereas LetterboxdList makes use of the list view, 
-    MyList makes use of the edit list view. 
+    MyList makes use of the edit list view (see extract.list_edit).
     
-    Initially I considered the edit-list view to be superior.
-    The information is more easily grabbed. However, it is possible to grab every necessesary attribute
-    using the view-list soup alone (with the exception of the public status of the list)
+    The edit view is the only one which shows the public status of the list,
+    and the notes on each entry. Otherwise, the attributes are read from the snapshot
+    in the same way, so only the setters are defined here.
     """ 
 
-    @property
-    def _id(self):
-        return int(self.soup.find('input', attrs={'name': 'filmListId'}).get('value'))
-
-    @property
-    def username(self):
-        return self.soup.find('body', class_='lists-edit').get('data-owner')
-
-    @property
-    def name(self):
-        return self.soup.find('input', attrs={'name': 'name'}).get('value')
-
-    @property
-    def tags(self):
-        return [i.get('value') for i in self.soup.find_all('input', attrs={'name': 'tag'})]
-
-    @property
-    def ranked(self):
-        return bool(self.soup.find('input', attrs={'id': 'show-item-numbers', 'checked':True}))
-
-    @property
-    def description(self):
-        description = self.soup.find('textarea', attrs={'name': 'notes'}).text
-        return '' if not description else description
-
-    @property
-    def entries(self):
-
-        def get_film_data(soup):
-            """ Returns the data for an individual film in the entries.
-            This consists the film_id
-            And, if one exists, the review (notes), and if the review (notes) contain spoilers
-            
-            r-type: dict
-            """
-            film_id = int(soup.get('data-film-id'))
-            notes = soup.find('input', attrs={'name': 'review', 'value': True}).get('value')
-            if not notes:
-                return {'filmId': film_id}
-            contains_spoilers = bool(soup.find('input', attrs={'name': 'containsSpoilers', 'value': 'true'}))
-            return {'filmId': film_id, 'review': notes, 'containsSpoilers': contains_spoilers}
-
-        list_items = self.soup.find_all('li', class_='film-list-entry')
-        entries = [get_film_data(film) for film in list_items]
-        return entries
-
     """
     ** Setter Methods
     These setter method should be utilised if you want to change a single setting
     Otherwise, it's easier and more efficient to use the update_values() method.
     """
-    @name.setter
+    @LetterboxdList.name.setter
     def name(self, name):
         """ Setter for the name. """
         # Edge case
@@ -767,7 +867,7 @@ class MyList(LetterboxdList):
         # Make post request to update name
         self.update(name=name)
 
-    @tags.setter
+    @LetterboxdList.tags.setter
     def tags(self, tags, append=False):
         """ Setter for the tags. 
         Keyword parameters:
@@ -798,7 +898,7 @@ class MyList(LetterboxdList):
         # Make post request to update public/private status
         self.update(public=value)
 
-    @ranked.setter
+    @LetterboxdList.ranked.setter
     def ranked(self, value):
         """ Setter for whether a list is ranked or not. """
         # Edge case
@@ -814,7 +914,7 @@ class MyList(LetterboxdList):
         # Make post request to update ranked/unranked status
         self.update(ranked=value)
 
-    @description.setter
+    @LetterboxdList.description.setter
     def description(self, text, append=False):
         """ Setter for the tags. 
         Keyword parameters:
@@ -842,41 +942,97 @@ class MyList(LetterboxdList):
         super().add_comment(comment)
 
 
-def get_film_names(film_ids):
-    """ Creates or edits a list used by the program which 
-    is then used by this function to determine the names which
-    correspond to the given ids. """
+"""
+** Film names **
+"""
+## The private list used (as a last resort) to find the names of films
+TEMP_LIST_NAME = "test003"
+TEMP_LIST_LOCK = threading.Lock()
 
-    ## Try to ensure correct format of data
-    # If not list of dicts, change list into dicts
-    if not all([type(x) is dict for x in film_ids]):
-        if not all(type(x) is int for x in film_ids):
-            raise TypeError(f"Invalid input: {film_ids}. Expected list of dicts or list.")
+## If no more than this many films are missing from the catalog (and their slugs are known),
+# their names are taken from their film pages, rather than using the temp list
+MAX_FILM_PAGE_LOOKUPS = 10
 
-        # If list of ints, convert to entries format (list of dicts)
-        film_ids = [{'filmId': film_id} for film_id in film_ids]
-    
+def get_film_ids(film_ids):
+    """ Converts an entries list, or a list of ids (int or str), to a list of int ids. 
+    r-type: list of ints """
     try:
-        temp_list = MyList(name="test003")
-    except:
+        return [int(x['filmId']) if isinstance(x, dict) else int(x) for x in film_ids]
+    except (KeyError, TypeError, ValueError):
+        raise TypeError(f"Invalid input: {film_ids}. Expected list of dicts or list.")
+
+def get_film_names(film_ids, max_workers=4):
+    """ Returns the names which correspond to the given ids.
+    The names are taken from the film catalog, which collects them from pages already scraped
+    (e.g. the data-film-name of posters). Only the ids missing from it are requested:
+        - individually from their film pages, if there are only a few and their slugs are known
+        - otherwise all at once, by putting them into a temporary list and reading its pages
+    
+    Parameters:
+    - film_ids (list of dicts or ints)
+    - max_workers (int) - the number of film pages requested at once
+    r-type: dict {film_id: film_name} """
+    film_ids = get_film_ids(film_ids)
+    catalog = get_catalog()
+    film_names = catalog.get_names(film_ids) if catalog else {}
+
+    if (missing := [i for i in film_ids if i not in film_names]) and catalog:
+        film_names.update(get_film_names_from_film_pages(missing, max_workers))
+
+    if (missing := [i for i in film_ids if i not in film_names]):
+        film_names.update(get_film_names_from_temp_list(missing))
+
+    return {i: film_names[i] for i in film_ids if i in film_names}
+
+def get_film_names_from_film_pages(film_ids, max_workers=4):
+    """ Returns the names of the films whose slugs are in the catalog,
+    provided there are no more than MAX_FILM_PAGE_LOOKUPS of them.
+    r-type: dict {film_id: film_name} """
+    slugs = {k:v['slug'] for k,v in get_catalog().get_many(film_ids).items() if v['slug']}
+    if not slugs or len(slugs) > MAX_FILM_PAGE_LOOKUPS:
+        return {}
+
+    def get_name(film_id, slug):
+        """ Returns the name from the film's page, or None if the slug no longer leads to the film
+        (e.g. a 404 after the film was renamed), so that it's left for the temp list. """
         try:
-            temp_list = MyList.new(
-                name=temp_list_name, 
-                description="Please do not delete me!",
-                public=False,
-                entries=film_ids
-                )
+            film = FilmInfo(slug)
+            return film.name if int(film.id_) == film_id else None
+        except Exception:
+            return None
+
+    names = util.concurrent_map(lambda item: get_name(*item), slugs.items(), max_workers)
+    return {k:v for k,v in zip(slugs.keys(), names) if v}
+
+def get_film_names_from_temp_list(film_ids):
+    """ Creates or edits a list used by the program which 
+    is then used by this function to determine the names which
+    correspond to the given ids. 
+    Only one thread can use the list at a time.
+    r-type: dict {film_id: film_name} """
+    entries = [{'filmId': film_id} for film_id in film_ids]
+
+    with TEMP_LIST_LOCK:
+        try:
+            temp_list = MyList(name=TEMP_LIST_NAME)
         except:
-            raise Exception("Could not load or create list")
-    else:
-        print("Successfully loaded temp_list")
-    finally:
-        temp_list.update(entries=film_ids)
+            try:
+                temp_list = MyList.new(
+                    name=TEMP_LIST_NAME, 
+                    description="Please do not delete me!",
+                    public=False,
+                    entries=entries
+                    )
+            except:
+                raise Exception("Could not load or create list")
+        else:
+            temp_list.update(entries=entries)
 
-    film_names = temp_list.get_film_names()
-    
-    ## Change temp_list back to being empty
-    temp_list.clear()
+        try:
+            film_names = temp_list.get_film_names()
+        finally:
+            ## Change temp_list back to being empty
+            temp_list.clear()
 
     return film_names 
 
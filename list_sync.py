@@ -0,0 +1,173 @@
+"""
+    For keeping many of the user's lists up to date at once,
+    e.g. a list for each genre and year, built from FilmSearch results.
+
+    Given the state each list should be in, the current lists are loaded concurrently,
+    and only the lists which differ are saved (or created). Saves and comments are made a few at a time,
+    and are paced by the SESSION's rate_limiter.
+
+    Example:
+        desired = [
+            {'name': f"Horror {year}", 'public': True, 'entries': FilmSearch(genre="Horror", year=year)()}
+            for year in range(2000, 2021)
+        ]
+        ListSync(desired, show_changes=True)()
+"""
+
+# Imports
+import time
+import requests
+
+# Local Imports
+from session import SESSION
+from list_maker import MyList
+from entry_set import EntrySet
+import util
+
+
+class ListSync():
+    """ Brings a batch of the user's lists into their desired states, making only the changes needed.
+
+    Each list gets a plan (a dict):
+    - name (str)
+    - action (str) - 'create', 'update' or 'none'
+    - changes (dict) - the attributes which differ from the current list (see MyList.get_changes)
+    - added, removed (int) - the number of films added to/removed from the list
+    - list (MyList or None) - None if the list doesn't exist yet
+    - load_seconds, save_seconds (float)
+    - error (Exception or None) - an error loading or saving the list doesn't stop the rest of the batch
+    """
+
+    ## The attributes a list can be given (besides its name)
+    attributes = ['tags', 'public', 'ranked', 'description', 'entries']
+
+    def __init__(self, desired, max_workers=4, show_changes=False):
+        """
+        Parameters:
+        - desired (list of dicts) - the state of each list. Each must have a 'name',
+            and can have any of the attributes. Attributes which are left out aren't changed.
+            The entries are in the form {'filmId': ...} (as returned by FilmSearch), and duplicates are dropped
+        - max_workers (int) - the number of lists loaded or saved at once
+        - show_changes (bool) - if True, a comment showing the films added/removed is added to each
+            (public) list whose entries change
+        """
+        if any(unknown_keys := {k for d in desired for k in d if k not in self.attributes + ['name']}):
+            raise KeyError(f"Unknown keys: {unknown_keys}")
+        if len(names := [d['name'] for d in desired]) != len(set(names)):
+            raise Exception("Each list can only be given one desired state")
+
+        self.desired = [self.normalise(d) for d in desired]
+        self.max_workers = max_workers
+        self.show_changes = show_changes
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tLists: {len(self.desired)}\tWorkers: {self.max_workers} >"
+
+    def __call__(self, dry_run=False):
+        """ Plans, and (unless dry_run) makes, the changes to every list, then prints a report.
+        r-type: list of dicts (plans) """
+        plans = self.plan()
+        if not dry_run:
+            self.execute(plans)
+        self.report(plans)
+        return plans
+
+    @staticmethod
+    def normalise(desired):
+        """ Removes any duplicate entries from a desired state (keeping the first of each),
+        as saving a list does (e.g. a FilmSearch may return a film twice).
+        r-type: dict """
+        desired = dict(desired)
+        if 'entries' in desired:
+            desired['entries'] = EntrySet(desired['entries']).to_list()
+        return desired
+
+    """
+    ** Planning **
+    """
+    def plan(self):
+        """ Loads the current lists concurrently, and works out the changes each one needs.
+        r-type: list of dicts """
+        # Log in before the threads start, so that they don't each try to
+        if not SESSION.logged_in:
+            SESSION()
+        return util.concurrent_map(self.plan_list, self.desired, self.max_workers)
+
+    @staticmethod
+    def plan_list(desired):
+        """ Loads a single list, and works out the changes it needs.
+        r-type: dict """
+        attrs = {k:v for k,v in desired.items() if k != 'name'}
+        plan = dict(
+            name=desired['name'], action='none', changes={}, added=0, removed=0,
+            list=None, load_seconds=0, save_seconds=0, error=None
+        )
+
+        start = time.perf_counter()
+        try:
+            plan['list'] = MyList(desired['name'])
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                plan['error'] = e
+            else:
+                plan.update(action='create', changes=attrs, added=len(attrs.get('entries', [])))
+        except Exception as e:
+            plan['error'] = e
+        plan['load_seconds'] = time.perf_counter() - start
+
+        if plan['list'] is not None:
+            plan['changes'] = plan['list'].get_changes(**attrs)
+            if 'entries' in plan['changes']:
+                new = {i['filmId'] for i in plan['changes']['entries']}
+                old = {i['filmId'] for i in plan['list'].entries_view}
+                plan['added'], plan['removed'] = len(new - old), len(old - new)
+            if plan['changes']:
+                plan['action'] = 'update'
+        return plan
+
+    """
+    ** Executing **
+    """
+    def execute(self, plans):
+        """ Makes the planned changes, up to max_workers lists at a time.
+        Lists which need no changes are skipped. """
+        todo = [plan for plan in plans if plan['action'] != 'none' and not plan['error']]
+        # Consume the results, so that every list is saved
+        for _ in util.concurrent_imap(self.apply, todo, self.max_workers):
+            pass
+
+    def apply(self, plan):
+        """ Makes the planned changes to a single list (creating it if need be).
+        Any error is recorded in the plan, rather than raised. """
+        start = time.perf_counter()
+        try:
+            if plan['action'] == 'create':
+                plan['list'] = MyList.new(plan['name'], **plan['changes'])
+            else:
+                my_list = plan['list']
+                show_changes = self.show_changes and 'entries' in plan['changes'] and my_list.public
+                my_list.update(show_changes=show_changes, **plan['changes'])
+        except Exception as e:
+            plan['error'] = e
+        plan['save_seconds'] = time.perf_counter() - start
+        return plan
+
+    """
+    ** Reporting **
+    """
+    @staticmethod
+    def report(plans):
+        """ Prints the action taken for each list, and how long it took. """
+        print(f"{'list':<40}{'action':<8}{'added':>7}{'removed':>9}{'load s':>9}{'save s':>9}  changes")
+        for plan in plans:
+            changes = ', '.join(plan['changes']) if not plan['error'] else f"ERROR: {plan['error']!r}"
+            print(
+                f"{plan['name'][:39]:<40}{plan['action']:<8}{plan['added']:>7}{plan['removed']:>9}"
+                f"{plan['load_seconds']:>9.2f}{plan['save_seconds']:>9.2f}  {changes}"
+            )
+
+        actions = [plan['action'] for plan in plans if not plan['error']]
+        print(
+            f"{len(plans)} lists: {actions.count('create')} created, {actions.count('update')} updated, "
+            f"{actions.count('none')} unchanged, {sum(bool(plan['error']) for plan in plans)} failed"
+        )
@@ -0,0 +1,223 @@
+"""
+    For pacing the requests made to Letterboxd, so that concurrent scrapers
+    do not send more requests than the site will tolerate.
+
+    - RateLimiter - a token bucket.
+    - AdaptiveRateLimiter - used by the SESSION. Each class of route (e.g. ajax searches, film pages)
+        has its own token bucket, and the number of requests in flight at once is adjusted
+        AIMD-style (additive increase, multiplicative decrease) based on the responses received.
+"""
+
+# Imports
+import re
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+
+
+class RateLimiter():
+    """ A token bucket shared by every thread (and coroutine) making requests.
+    Tokens are added at a steady rate, up to a maximum of burst tokens.
+    Each request takes a token, waiting for one if the bucket is empty. """
+
+    def __init__(self, rate, burst=None):
+        """
+        Parameters:
+        - rate (int or float) - the number of requests allowed per second
+        - burst (int or None) - the number of requests that can be made at once
+            after a quiet period. Defaults to the rate.
+        """
+        self.rate = rate
+        self.burst = burst or rate
+
+        self.__tokens = self.burst
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tRate: {self.rate}/s\tBurst: {self.burst} >"
+
+    def reserve(self):
+        """ Takes a token from the bucket, and returns the number of seconds
+        to wait before it can be used.
+        r-type: float """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.__tokens -= 1
+            if self.__tokens >= 0:
+                return 0
+            return -self.__tokens / self.rate
+
+    def set_rate(self, rate):
+        """ Changes the rate, keeping the tokens accumulated at the old rate. """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.rate = rate
+
+    def wait(self):
+        """ Blocks until a request may be made. """
+        if delay := self.reserve():
+            time.sleep(delay)
+
+    async def async_wait(self):
+        """ The async equivalent of wait(). """
+        if delay := self.reserve():
+            await asyncio.sleep(delay)
+
+
+def get_retry_after(value):
+    """ Returns the number of seconds given by a Retry-After header,
+    which is either a number of seconds or an HTTP date.
+    r-type: float or None """
+    if not value:
+        return None
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter():
+    """ Paces every request made by the session (from any thread or coroutine).
+
+    - Requests are grouped into route classes, each with its own budget (a token bucket).
+        A request waits for a token from its class's bucket.
+    - The number of requests in flight at once (the concurrency limit) grows by one
+        for every limit's-worth of healthy responses, and is halved by a 429 or 503.
+    - A 429/503 also halves the rate of the route class it came from (recovering additively),
+        and if it has a Retry-After header, the route class is paused for that long. 
+
+    A request is made between acquire() and release():
+        route_class = limiter.acquire("GET", suburl)
+        response = ...
+        limiter.release(route_class, response.status_code, response.headers.get('Retry-After'))
+    """
+
+    ## (name, method, suburl pattern, requests per second)
+    # The first match is used
+    default_route_classes = [
+        ('post', "POST", r"", 2),
+        ('ajax_search', None, r"^/?films/ajax/", 4),
+        ('csi', None, r"^/?csi/", 8),
+        ('film', None, r"^/?film/", 6),
+        ('default', None, r"", 8),
+    ]
+
+    ## Status codes which mean the site is overloaded
+    backoff_statuses = (429, 503)
+
+    ## How often to check for a free slot, when the concurrency limit has been reached
+    poll_interval = 0.01 # seconds
+
+    def __init__(self, route_classes=None, initial_concurrency=4, min_concurrency=1, max_concurrency=32, min_rate=0.5):
+        """
+        Parameters:
+        - route_classes (list of tuples) - (name, method, pattern, rate), replacing the default_route_classes
+        - initial_concurrency (int) - the concurrency limit to start from
+        - min_concurrency, max_concurrency (int) - the bounds of the concurrency limit
+        - min_rate (float) - the lowest rate a route class will back off to
+        """
+        self.route_classes = [
+            (name, method, re.compile(pattern), rate) for name, method, pattern, rate in (route_classes or self.default_route_classes)
+        ]
+        self.budgets = {name: rate for name, _, _, rate in self.route_classes}
+        self.buckets = {name: RateLimiter(rate) for name, _, _, rate in self.route_classes}
+
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.limit = initial_concurrency
+        self.in_flight = 0
+
+        self.__successes = 0
+        self.__paused_until = {}
+        self.__last_backoff = 0
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        rates = ', '.join([f"{k}: {v.rate:g}/s" for k,v in self.buckets.items()])
+        return f"< {self.__class__.__name__}\tConcurrency: {self.in_flight}/{self.limit}\tRates: {rates} >"
+
+    def get_route_class(self, method, suburl):
+        """ Returns the name of the route class a request belongs to.
+        r-type: str """
+        return next(
+            name for name, route_method, pattern, _ in self.route_classes
+            if route_method in (None, method) and pattern.search(suburl)
+        )
+
+    def __try_acquire(self, route_class):
+        """ Takes a slot (if one is free) and a token for the route class.
+        Returns the number of seconds to wait; if there's no slot, this should be
+        waited before trying again, otherwise the request can be made after waiting.
+        r-type: tuple (float, bool - whether a slot was taken) """
+        with self.__lock:
+            now = time.monotonic()
+            if (paused := self.__paused_until.get(route_class, 0) - now) > 0:
+                return paused, False
+            if self.in_flight >= self.limit:
+                return self.poll_interval, False
+            self.in_flight += 1
+        return self.buckets[route_class].reserve(), True
+
+    def acquire(self, method, suburl):
+        """ Blocks until a request may be made.
+        r-type: str (the route class, to be passed to release()) """
+        route_class = self.get_route_class(method, suburl)
+        while True:
+            delay, acquired = self.__try_acquire(route_class)
+            if delay:
+                time.sleep(delay)
+            if acquired:
+                return route_class
+
+    async def async_acquire(self, method, suburl):
+        """ The async equivalent of acquire(). """
+        route_class = self.get_route_class(method, suburl)
+        while True:
+            delay, acquired = self.__try_acquire(route_class)
+            if delay:
+                await asyncio.sleep(delay)
+            if acquired:
+                return route_class
+
+    def release(self, route_class, status_code=None, retry_after=None):
+        """ Frees the slot taken by acquire(), and adjusts the limits based on the response.
+
+        Parameters:
+        - route_class (str) - returned by acquire()
+        - status_code (int or None) - None if no response was received
+        - retry_after (str or None) - the Retry-After header of the response
+        """
+        bucket = self.buckets[route_class]
+        with self.__lock:
+            self.in_flight -= 1
+
+            if status_code in self.backoff_statuses:
+                now = time.monotonic()
+                if (delay := get_retry_after(retry_after)):
+                    self.__paused_until[route_class] = max(self.__paused_until.get(route_class, 0), now + delay)
+
+                # Responses to requests that were already in flight shouldn't cause another decrease
+                if now - self.__last_backoff >= 1:
+                    self.__last_backoff = now
+                    self.__successes = 0
+                    self.limit = max(self.min_concurrency, self.limit // 2)
+                    bucket.set_rate(max(self.min_rate, bucket.rate / 2))
+
+            elif status_code is not None and status_code < 400:
+                self.__successes += 1
+                if self.__successes >= self.limit:
+                    self.__successes = 0
+                    self.limit = min(self.max_concurrency, self.limit + 1)
+                if bucket.rate < self.budgets[route_class]:
+                    bucket.set_rate(min(self.budgets[route_class], bucket.rate + 1 / bucket.rate))
@@ -0,0 +1,208 @@
+"""
+    An optional on-disk cache for the responses to GET requests made by the session.
+
+    To use it, set the session's cache:
+        SESSION.cache = ResponseCache()
+"""
+
+# Imports
+import os
+import re
+import json
+import zlib
+import sqlite3
+import hashlib
+import threading
+import pendulum
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+
+class ResponseCache():
+    """ Stores compressed responses in an SQLite database.
+
+    - Each route (matched by regex against the suburl) has its own time to live (ttl).
+    - Once a response is stale, it is revalidated using its ETag/Last-Modified headers, if it has them.
+    - The least recently used responses are evicted once the cache exceeds max_bytes. """
+
+    ## Time (in seconds) that responses are considered fresh for
+    # The first matching pattern is used. A ttl of 0 means the route is never cached.
+    default_route_ttls = [
+        (r"^$", 0),                                           # main page (used to set cookies)
+        (r"^/?user/", 0),                                     # login
+        (r"/edit/?$", 0),                                     # list edit pages
+        (r"/blocked/$", 0),
+        (r"^csi/film/[^/]+/rating-histogram/", 60*60*24),
+        (r"^csi/", 60*60),
+        (r"^films/ajax/popular/", 60*60*6),
+        (r"^film/[^/]+/ratings/", 60*60*6),
+        (r"^film/", 60*60*24*7),
+        (r"/list/", 60*60),
+        (r"", 60*60)                                          # everything else
+    ]
+
+    ## Cookies that change the content of a page, and so must be part of the key
+    key_cookies = ['filmFilter']
+
+    ## Parts of urls whose responses may be changed by a POST (e.g. saving a list, or adding a comment to one)
+    # It isn't known which of them a POST affects, so any POST removes them all (see invalidate)
+    invalidated_by_post = ['/list/']
+
+    def __init__(self, path="data/cache/responses.sqlite3", max_bytes=256*1024*1024, route_ttls=None):
+        """
+        Parameters:
+        - path (str) - the location of the database
+        - max_bytes (int) - the maximum (compressed) size of the cache
+        - route_ttls (list of tuples) - (pattern, ttl) pairs which are checked before the default_route_ttls
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.route_ttls = [(re.compile(p), t) for p,t in (route_ttls or []) + self.default_route_ttls]
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.__connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                encoding TEXT,
+                body BLOB,
+                size INTEGER,
+                expires INTEGER,
+                last_used INTEGER
+            )""")
+        self.__connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.__connection.commit()
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tPath: {self.path}\tSize: {self.size}/{self.max_bytes} >"
+
+    @property
+    def size(self):
+        """ The total size of the compressed responses in the cache.
+        r-type: int """
+        with self.__lock:
+            return self.__connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get_ttl(self, suburl):
+        """ Returns the time to live for responses from a given suburl.
+        r-type: int """
+        return next(ttl for pattern, ttl in self.route_ttls if pattern.search(suburl))
+
+    def get_key(self, method, suburl, params=None, cookies=None, session_cookies=None, user=None):
+        """ Returns the key a request's response is stored under,
+        or None if the request should not be cached.
+
+        Parameters:
+        - user (str or None) - the user the session is logged in as, since pages differ once logged in
+        r-type: str or None """
+        if method != "GET" or not self.get_ttl(suburl):
+            return None
+
+        # Cookies passed to the request take priority over those in the session
+        cookie_values = {}
+        for name in self.key_cookies:
+            value = cookies.get(name) if cookies else None
+            if value is None and session_cookies is not None:
+                value = session_cookies.get(name)
+            cookie_values[name] = value
+
+        key_data = json.dumps([method, suburl, sorted((params or {}).items()), cookie_values, user], default=str)
+        return hashlib.sha1(key_data.encode()).hexdigest()
+
+    def get(self, key):
+        """ Returns a cached response, and whether or not it is still fresh.
+        r-type: tuple (Response or None, bool) """
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT url, status, headers, encoding, body, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None, False
+
+            now = pendulum.now().int_timestamp
+            self.__connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.__connection.commit()
+
+        url, status, headers, encoding, body, expires = row
+        response = Response()
+        response.url = url
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        response.encoding = encoding
+        response._content = zlib.decompress(body)
+        return response, expires > now
+
+    @staticmethod
+    def get_validators(response):
+        """ Returns the headers needed to revalidate a stale response.
+        r-type: dict """
+        validators = {}
+        if etag := response.headers.get('ETag'):
+            validators['If-None-Match'] = etag
+        if last_modified := response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = last_modified
+        return validators
+
+    def set(self, key, suburl, response):
+        """ Stores a response in the cache, then evicts the least recently used
+        responses if the cache has grown too large. """
+        body = zlib.compress(response.content)
+        now = pendulum.now().int_timestamp
+
+        # Only the headers needed for revalidation and decoding are kept
+        headers = {k:v for k,v in response.headers.items() if k.lower() in ('etag', 'last-modified', 'content-type')}
+
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(headers), response.encoding,
+                    body, len(body), now + self.get_ttl(suburl), now)
+            )
+            self.__connection.commit()
+        self.evict()
+
+    def refresh(self, key, suburl):
+        """ Marks a cached response as fresh again (e.g. after a 304 Not Modified response). """
+        now = pendulum.now().int_timestamp
+        with self.__lock:
+            self.__connection.execute(
+                "UPDATE responses SET expires = ?, last_used = ? WHERE key = ?",
+                (now + self.get_ttl(suburl), now, key)
+            )
+            self.__connection.commit()
+
+    def evict(self):
+        """ Removes the least recently used responses until the cache is within max_bytes. """
+        if (excess := self.size - self.max_bytes) <= 0:
+            return
+
+        with self.__lock:
+            rows = self.__connection.execute("SELECT key, size FROM responses ORDER BY last_used")
+            evicted = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                evicted.append((key,))
+                excess -= size
+            self.__connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+            self.__connection.commit()
+
+    def invalidate(self, url_parts=None):
+        """ Removes the responses whose urls contain any of the given parts.
+        Parameters:
+        - url_parts (list of str) - defaults to invalidated_by_post
+        """
+        url_parts = self.invalidated_by_post if url_parts is None else url_parts
+        with self.__lock:
+            self.__connection.executemany("DELETE FROM responses WHERE instr(url, ?) > 0", [(i,) for i in url_parts])
+            self.__connection.commit()
+
+    def clear(self):
+        """ Removes every response from the cache. """
+        with self.__lock:
+            self.__connection.execute("DELETE FROM responses")
+            self.__connection.commit()
@@ -0,0 +1,136 @@
+"""
+    For recovering from transient failures (e.g. a 503, or a dropped connection) without
+    losing the rest of a scrape, and for failing fast while the site is down.
+
+    - RetryPolicy - which requests are safe to repeat, and how long to wait between attempts.
+    - CircuitBreaker - after enough consecutive failures, requests are refused (CircuitOpenException)
+        until the site has had time to recover.
+"""
+
+# Imports
+import re
+import time
+import random
+import threading
+
+# Local Imports
+from exceptions import CircuitOpenException
+
+
+def is_failure(status_code):
+    """ Returns True if a response status means the site (rather than the request) is at fault,
+    so the same request may succeed later.
+    r-type: bool """
+    return status_code == 429 or status_code >= 500
+
+
+class RetryPolicy():
+    """ Retries failed requests with exponential backoff and full jitter.
+    GET requests are always retried. POST requests are only retried if repeating them has the same
+    effect as sending them once (see safe_posts). """
+
+    ## POST routes which are safe to repeat, and the form field that must be non-empty for them to be
+    # e.g. saving an existing list (filmListId is set) replaces it with the same data,
+    # whereas saving a new list (no filmListId) would create a duplicate
+    safe_posts = [
+        (r"^/?s/save-list$", 'filmListId'),
+    ]
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=30):
+        """
+        Parameters:
+        - max_retries (int) - the number of times a request is retried
+        - backoff_base (float) - seconds; the n-th retry waits a random time of up to backoff_base * 2^(n-1)
+        - backoff_max (float) - seconds; the most that's waited before any retry
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tRetries: {self.max_retries}\tBackoff: {self.backoff_base}-{self.backoff_max}s >"
+
+    def is_retryable(self, method, suburl, data=None):
+        """ Returns True if a request is safe to repeat.
+        r-type: bool """
+        if method in ("GET", "HEAD", "OPTIONS"):
+            return True
+        if method != "POST":
+            return False
+        return any(
+            re.search(pattern, suburl) and (data or {}).get(required_field)
+            for pattern, required_field in self.safe_posts
+        )
+
+    def get_delay(self, attempt, retry_after=None):
+        """ Returns the number of seconds to wait before a retry.
+
+        Parameters:
+        - attempt (int) - 1 for the first retry
+        - retry_after (float or None) - seconds the server asked to wait (from a Retry-After header)
+        r-type: float """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**(attempt-1)))
+        if retry_after:
+            delay = max(delay, min(self.backoff_max, retry_after))
+        return delay
+
+
+class CircuitBreaker():
+    """ Stops requests being made while the site is failing.
+
+    - closed - requests are made as usual. After failure_threshold consecutive failures, the circuit opens.
+    - open - requests fail immediately, until reset_timeout seconds have passed.
+    - half-open - a single trial request is let through. If it succeeds the circuit closes,
+        otherwise it opens again. """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Parameters:
+        - failure_threshold (int) - consecutive failures before the circuit opens
+        - reset_timeout (float) - seconds the circuit stays open before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = 'closed'
+        self.__failures = 0
+        self.__opened_at = 0
+        self.__trial_in_flight = False
+        self.__lock = threading.Lock()
+
+    def __repr__(self):
+        return f"< {self.__class__.__name__}\tState: {self.state}\tFailures: {self.__failures}/{self.failure_threshold} >"
+
+    def before_request(self):
+        """ Raises CircuitOpenException if a request should not be made right now. """
+        with self.__lock:
+            if self.state == 'closed':
+                return
+            if self.state == 'open':
+                if (remaining := self.__opened_at + self.reset_timeout - time.monotonic()) > 0:
+                    raise CircuitOpenException(f"Letterboxd is failing; requests are paused for another {remaining:.0f}s")
+                self.state = 'half-open'
+            if self.__trial_in_flight:
+                raise CircuitOpenException("Letterboxd is failing; waiting on a trial request")
+            self.__trial_in_flight = True
+
+    def record(self, failed):
+        """ Records the outcome of a request.
+
+        Parameters:
+        - failed (bool or None) - True if there was no response, or the response was a failure (see is_failure).
+            None if the request went wrong for a reason other than the site, in which case
+            it doesn't count either way (but a trial request may be made again)
+        """
+        with self.__lock:
+            self.__trial_in_flight = False
+            if failed is None:
+                return
+            if not failed:
+                self.__failures = 0
+                self.state = 'closed'
+                return
+            self.__failures += 1
+            if self.state == 'half-open' or self.__failures >= self.failure_threshold:
+                self.state = 'open'
+                self.__opened_at = time.monotonic()
@@ -6,11 +6,18 @@
 import requests
 from bs4 import BeautifulSoup as bs
 import re
+import os
 import pendulum
 import json
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
 
 # Local Imports
 import util
+from rate_limiter import AdaptiveRateLimiter, get_retry_after
+from retry import RetryPolicy, CircuitBreaker, is_failure
 from exceptions import LoginException, LetterboxdException
 
 
@@ -25,7 +32,22 @@ def make_soup(request):
 class LetterboxdSession(requests.Session):
     """ Creates a session object that can be used to create requests as a user. """
 
-    MAIN_URL = "https://letterboxd.com/"
+    ## Can be pointed elsewhere (e.g. at benchmarks/fake_server.py) with the LETTERBOXD_URL environment variable
+    MAIN_URL = os.environ.get("LETTERBOXD_URL", "https://letterboxd.com/")
+
+    ## Saved cookies (and therefore the login) are reused by new sessions until they expire
+    cookie_store = "session_cookies"
+    cookie_store_ttl = 60*60*24*14 # seconds
+
+    ## The maximum number of connections kept open, i.e. the number of threads that can make requests at once
+    pool_maxsize = 32
+
+    ## Seconds to wait for a connection, and then for a response (per attempt)
+    timeout = (10, 30)
+
+    ## Search options (genres, services, filters) rarely change, so are cached between sessions
+    search_options_store = "cache/search_options"
+    search_options_ttl = 60*60*24*7 # seconds
 
     def __init__(self):
         super().__init__()
@@ -33,23 +55,48 @@ class LetterboxdSession(requests.Session):
         # Add User Agent
         self.headers.update(USER_AGENT)
 
-        # Set CSRF token
-        token = self.__get_token()
-        self.cookie_params = {'__csrf': token}
+        # Allow concurrent requests to each reuse a connection
+        self.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize))
+        self.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize))
 
         # Login details
+        # NOTE: no requests are made here. The CSRF token is fetched before the first POST,
+        # and the login only happens once a request that needs it is made.
         self.logged_in = False
         self.username = USER_DETAILS['username']
         self.password = USER_DETAILS['password']
+        # Requests made concurrently may each find that they need to login (or fetch the token),
+        # so only one does it at a time. Reentrant, since logging in makes requests itself
+        self.__login_lock = threading.RLock()
 
         ## Search Options & Available filters
-        response = self.request("GET", f"{self.username}/films/")
-        self.__search_options = make_soup(response)
-
+        # These are scraped the first time one of them is accessed
         self.year_range = (1860, pendulum.now()._start_of_decade().year+10)
-        self.genre_list = self.__get_genre_list()
-        self.service_list = self.__get_service_list()
-        self.filters_dict = self.__get_filters_dict()
+        self.__search_options = None
+        self.__search_options_lock = threading.Lock()
+
+        ## Response cache (opt-in)
+        # e.g. SESSION.cache = ResponseCache()
+        self.cache = None
+
+        ## Called (with no arguments) after every POST, to drop anything else a POST may have made stale
+        # e.g. the lists kept by LetterboxdList.entries_cache
+        self.post_listeners = []
+
+        ## Every request made (from any thread) is paced by the same rate limiter,
+        # which has a budget for each class of route, and adapts the number of requests in flight
+        # to the responses received. Set to None to disable
+        self.rate_limiter = AdaptiveRateLimiter()
+
+        ## Failed requests are retried (if safe to repeat), unless the site has been failing for a while
+        # Set either to None to disable
+        self.retry_policy = RetryPolicy()
+        self.circuit_breaker = CircuitBreaker()
+
+        ## Record/replay of requests (opt-in)
+        # e.g. SESSION.cassette = Cassette(path, mode='record')
+        # When replaying, no requests reach the network, so there is no login, CSRF token or rate limiting
+        self.cassette = None
 
     def __str__(self):
         return f"Session (Logged in == {self.logged_in})"
@@ -58,36 +105,163 @@ class LetterboxdSession(requests.Session):
         return f"<{type(self).__name__}>\nusername: {self.username}\nlogged_in: {self.logged_in}"
 
     def __call__(self):
-        """ Login to Letterboxd if not already. """
-        if self.logged_in:
-            print("Already logged in")
-        else:
-            self.__login()
+        """ Login to Letterboxd if not already. 
+        If a previous session's cookies have been saved and are still valid,
+        these are used instead of going through the login process again. """
+        with self.__login_lock:
+            if self.logged_in:
+                print("Already logged in")
+                return
+            if not self.__load_cookies():
+                self.__login()
+                self.__save_cookies()
             self.logged_in = True
 
-    def request(self, method, suburl='', **kwargs):
+    def request(self, method, suburl='', login_required=None, deadline=None, **kwargs):
         """ 
         ** Overloading **
         Customise request to default to main Letterboxd url.
         And to include the __CSRF token if it's a POST request. 
+
+        Failed requests are retried (if safe to repeat) according to the session's retry_policy.
+        Each attempt times out after the session's timeout, unless a timeout is passed.
+
+        Parameters:
+        - login_required (bool or None) - if True, the session will login first (if not already).
+            Defaults to True for POST requests, and False otherwise.
+        - deadline (float or None) - the most seconds to spend on the request, including any retries
         """
-        if method == "POST":
+        replaying = self.cassette is not None and self.cassette.replaying
+
+        if login_required is None:
+            login_required = method == "POST"
+        if login_required and not self.logged_in and not replaying:
+            with self.__login_lock:
+                # Another thread may have logged in while this one waited
+                if not self.logged_in:
+                    self()
+
+        if method == "POST" and not replaying:
             if not kwargs.get("data"):
                 kwargs['data'] = self.cookie_params
             else:
                 kwargs['data'] = dict(self.cookie_params, **kwargs['data'])
 
-        response =  super().request(
-            method,
-            url=f"{self.MAIN_URL}{suburl}",
-            **kwargs
-        )
-        
+        ## Check the response cache (if enabled)
+        cache_key = cached_response = None
+        if self.cache is not None:
+            cache_key = self.cache.get_key(
+                method, suburl, kwargs.get('params'), kwargs.get('cookies'), self.cookies,
+                user=self.username if self.logged_in else None
+            )
+        if cache_key:
+            cached_response, fresh = self.cache.get(cache_key)
+            if fresh:
+                return cached_response
+            if cached_response:
+                # Stale, so ask the server whether it has changed
+                kwargs['headers'] = dict(kwargs.get('headers') or {}, **self.cache.get_validators(cached_response))
+
+        try:
+            response = self.__send_with_retries(method, suburl, replaying, deadline, **kwargs)
+        finally:
+            # A POST may change pages that are cached (e.g. a list that's been saved)
+            if method == "POST":
+                if self.cache is not None:
+                    self.cache.invalidate()
+                for listener in self.post_listeners:
+                    listener()
+
+        if cache_key and response.status_code == 304 and cached_response:
+            self.cache.refresh(cache_key, suburl)
+            return cached_response
+
         if not response.ok:
             response.raise_for_status()
-        
+
         self.get_html_response_dict(response)
 
+        # Only full pages are cached; a 304 (to the caller's own validators) has no body
+        if cache_key and response.status_code == 200:
+            self.cache.set(cache_key, suburl, response)
+
+        return response
+
+    def __send_with_retries(self, method, suburl, replaying, deadline=None, **kwargs):
+        """ Sends a request, retrying it if it fails and is safe to repeat.
+        Fails fast (CircuitOpenException) while the circuit_breaker is open.
+        Returns the last response, even if it failed; the caller checks its status.
+        r-type: Response """
+        kwargs.setdefault('timeout', self.timeout)
+        retryable = self.retry_policy is not None and self.retry_policy.is_retryable(method, suburl, kwargs.get('data'))
+        give_up_at = time.monotonic() + deadline if deadline else None
+
+        attempt = 0
+        while True:
+            if give_up_at:
+                if (remaining := give_up_at - time.monotonic()) <= 0:
+                    raise requests.Timeout(f"Deadline of {deadline}s exceeded: {method} {suburl}")
+                # No single attempt may run past the deadline
+                timeout = kwargs['timeout']
+                kwargs['timeout'] = tuple(min(t, remaining) for t in timeout) if isinstance(timeout, tuple) else min(timeout, remaining)
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_request()
+
+            response = error = failed = None
+            try:
+                try:
+                    response = self.__send(method, suburl, replaying, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                failed = error is not None or is_failure(response.status_code)
+            finally:
+                # failed is still None if the request failed for a reason other than the site
+                # (e.g. it's missing from the cassette, or the url is invalid); it's raised uncounted,
+                # but a trial request must still be cleared
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(failed)
+            if not failed:
+                return response
+
+            attempt += 1
+            delay = None
+            if retryable and attempt <= self.retry_policy.max_retries:
+                retry_after = get_retry_after(response.headers.get('Retry-After')) if response is not None else None
+                delay = self.retry_policy.get_delay(attempt, retry_after)
+            if delay is None or (give_up_at and time.monotonic() + delay >= give_up_at):
+                if error:
+                    raise error
+                return response
+
+            if not replaying:
+                time.sleep(delay)
+
+    def __send(self, method, suburl, replaying, **kwargs):
+        """ Sends a single request, paced by the rate_limiter,
+        or replays it from the cassette. 
+        r-type: Response """
+        if replaying:
+            return self.cassette.play(method, suburl, **kwargs)
+
+        route_class = self.rate_limiter.acquire(method, suburl) if self.rate_limiter is not None else None
+        response = None
+        try:
+            response =  super().request(
+                method,
+                url=f"{self.MAIN_URL}{suburl}",
+                **kwargs
+            )
+        finally:
+            if route_class:
+                self.rate_limiter.release(
+                    route_class,
+                    response.status_code if response is not None else None,
+                    response.headers.get('Retry-After') if response is not None else None
+                )
+
+        if self.cassette is not None:
+            self.cassette.record(method, suburl, response, **kwargs)
         return response
 
     @staticmethod
@@ -114,15 +288,24 @@ class LetterboxdSession(requests.Session):
         # Raise the Exception because the message_dict['result'] evaluated to false
         raise LetterboxdException(message)
 
+    @property
+    def cookie_params(self):
+        """ The __csrf token, which must be passed with any POST request.
+        r-type: dict """
+        return {'__csrf': self.__get_token()}
+
     @property
     def login_details(self):
         """ Convert username and password to dict for passing it as data to a request. """
         return {"username": self.username, "password": self.password}
 
     def __get_token(self):
-        """ Get the __csrf token and pass its value to an instance variable.
-        Called by __init__. """
-        self.request("GET")
+        """ Get the __csrf token from the session's cookies.
+        If the cookie has not been set yet, a request is made to the main page to get it. """
+        if 'com.xk72.webparts.csrf' not in self.cookies:
+            with self.__login_lock:
+                if 'com.xk72.webparts.csrf' not in self.cookies:
+                    self.request("GET")
         token = self.cookies['com.xk72.webparts.csrf']
         return token
 
@@ -131,7 +314,7 @@ class LetterboxdSession(requests.Session):
         If result is not successful, attempt to return the error
         displayed by the webpage """
 
-        response = self.request("POST", suburl="/user/login.do", data=self.login_details)
+        response = self.request("POST", suburl="/user/login.do", login_required=False, data=self.login_details)
         soup = make_soup(response)
         text = soup.text
 
@@ -153,21 +336,151 @@ class LetterboxdSession(requests.Session):
         else:
             raise LoginException(error)
 
-    def __get_genre_list(self):
+    """
+    ** Cookie Store **
+    """
+    def __save_cookies(self):
+        """ Saves the session's cookies (including the __csrf token) so that they
+        can be reused by __load_cookies() in a new session. """
+        cookies = [
+            {
+                'name': c.name,
+                'value': c.value,
+                'domain': c.domain,
+                'path': c.path,
+                'expires': c.expires,
+                'secure': c.secure
+            }
+            for c in self.cookies]
+
+        util.save_json_data(self.cookie_store, {
+            'username': self.username,
+            'expires': pendulum.now().int_timestamp + self.cookie_store_ttl,
+            'cookies': cookies
+        })
+
+    def __load_cookies(self):
+        """ Attempts to restore the cookies saved by a previous session.
+        The restored login is validated with a single request to the main page.
+        r-type: bool (True if the saved login is valid) """
+        try:
+            store = util.load_json_data(self.cookie_store)
+        except (FileNotFoundError, ValueError):
+            return False
+
+        now = pendulum.now().int_timestamp
+        if store.get('username') != self.username or store.get('expires', 0) < now:
+            # The saved cookies are for a different user or are stale
+            return False
+
+        for c in store['cookies']:
+            if c['expires'] and c['expires'] < now:
+                continue
+            self.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'], expires=c['expires'], secure=c['secure'])
+
+        # Validate the login (this also refreshes the __csrf cookie if necessary)
+        response = self.request("GET", login_required=False)
+        if make_soup(response).find('body', class_='logged-in'):
+            print(f"Restored login. Welcome back, {self.username}")
+            return True
+
+        # The saved login is no longer valid, so start from scratch
+        self.cookies.clear()
+        return False
+
+    """
+    ** Search Options **
+    """
+    @property
+    def genre_list(self):
+        """ Returns the list of genres you can search by on Letterboxd. """
+        return self.__get_search_options()['genre_list']
+
+    @property
+    def service_list(self):
+        """ Returns a list of services you can search by on Letterboxd. """
+        return self.__get_search_options()['service_list']
+
+    @property
+    def filters_dict(self):
+        """ Returns a dict of the filters that can be applied to the session
+        (e.g. hide-reviewed) """
+        return self.__get_search_options()['filters_dict']
+
+    def __get_search_options(self):
+        """ Returns the search options, the first time they are needed.
+        They are read from the cache if possible. If the cached options are older than
+        the search_options_ttl, they are still used, but refreshed in the background. 
+        r-type: dict """
+        if self.__search_options is not None:
+            return self.__search_options
+
+        try:
+            store = util.load_json_data(self.search_options_store)
+        except (FileNotFoundError, ValueError):
+            store = None
+
+        if not store or store.get('username') != self.username:
+            # Nothing usable has been cached, so we have to wait for the scrape
+            self.__refresh_search_options()
+            return self.__search_options
+
+        self.__search_options = store['options']
+        if store['fetched'] + self.search_options_ttl < pendulum.now().int_timestamp:
+            self.__refresh_search_options(background=True)
+        return self.__search_options
+
+    def __refresh_search_options(self, background=False):
+        """ Scrapes the search options from the user's films page, and caches them. 
+        If background, the scraping is done in a separate thread (unless one is already running). """
+        if not background:
+            with self.__search_options_lock:
+                # Another thread may have finished the scrape while we were waiting
+                if self.__search_options is None:
+                    self.__refresh_search_options_target()
+            return
+
+        if self.__search_options_lock.acquire(blocking=False):
+            threading.Thread(target=self.__refresh_search_options_target, args=(True,), daemon=True).start()
+
+    def __refresh_search_options_target(self, release_lock=False):
+        """ Makes the request for the search options. Called by __refresh_search_options(). """
+        try:
+            response = self.request("GET", f"{self.username}/films/")
+            soup = make_soup(response)
+            options = {
+                'genre_list': self.__get_genre_list(soup),
+                'service_list': self.__get_service_list(soup),
+                'filters_dict': self.__get_filters_dict(soup)
+            }
+            util.save_json_data(self.search_options_store, {
+                'username': self.username,
+                'fetched': pendulum.now().int_timestamp,
+                'options': options
+            })
+            self.__search_options = options
+        finally:
+            if release_lock:
+                self.__search_options_lock.release()
+
+    @staticmethod
+    def __get_genre_list(soup):
         """ Returns the list of genres you can search by on Letterboxd. """
-        return [i.text.lower() for i in self.__search_options.find_all('a', attrs={'class': 'item', 'href': re.compile('/films/genre/')})]
+        return [i.text.lower() for i in soup.find_all('a', attrs={'class': 'item', 'href': re.compile('/films/genre/')})]
 
-    def __get_service_list(self):
+    @staticmethod
+    def __get_service_list(soup):
         """ Returns a list of services you can search by on Letterboxd.
         NOTE: I think these may be specific to the user. 
         The code should still work since this is scraped using the user's session. """
-        return [i.text.strip() for i in self.__search_options.find('ul', id='services-menu').find_all('a')]
+        return [i.text.strip() for i in soup.find('ul', id='services-menu').find_all('a')]
 
-    def __get_filters_dict(self):
+    @staticmethod
+    def __get_filters_dict(soup):
         """ Returns a list of the filters that can be applied to the session
         (e.g. hide-reviewed)
         """
-        filter_li_tags = self.__search_options.find_all('li', class_='js-film-filter')
+        filter_li_tags = soup.find_all('li', class_='js-film-filter')
         data_categories = set([i.get('data-category') for i in filter_li_tags])
         filters = {i:[] for i in data_categories}
         [filters[i.get('data-category')].append(i.get('data-type')) for i in filter_li_tags]
@@ -176,11 +489,10 @@ class LetterboxdSession(requests.Session):
 
 
 # Create Session
+# NOTE: this does not make any requests. The session will login
+# the first time a request is made which requires it.
 SESSION = LetterboxdSession()
 
-# Login
-SESSION()
-
 
 if __name__ == "__main__":
     # Test code
@@ -3,30 +3,28 @@
 """
 
 # Local Imports
-from session import SESSION, make_soup
+from session import SESSION
+from extract import get_extractor
 
 
-def __get_people(soup):
+def __get_people(page):
     """ Scrapes the profile links (original usernames) of all people on a given person's followers/following page. """
-    return [person.find('a').get('href').replace('/', '') for person in soup.find_all("td", class_="table-person")]
+    return get_extractor().people(page)
 
 def get_following(username=SESSION.username):
     """ Returns a list of the users a given user follows. """
     request = SESSION.request("GET", f"{username}/following/")
-    soup = make_soup(request)
-    return __get_people(soup)
+    return __get_people(request.text)
 
 def get_followers(username=SESSION.username):
     """ Returns a list of the users a given user is followed by. """
     request = SESSION.request("GET", f"{username}/followers/")
-    soup = make_soup(request)
-    return __get_people(soup)
+    return __get_people(request.text)
 
 def get_blocked():
     """ Returns a list of the users in your block list.
     NOTE: You can only see who you've blocked, hence there is no
     username argument for this function unlike following and followers. """
     username = SESSION.username
-    request = SESSION.request("GET", f"{username}/blocked/")
-    soup = make_soup(request)
-    return __get_people(soup)
\ No newline at end of file
+    request = SESSION.request("GET", f"{username}/blocked/", login_required=True)
+    return __get_people(request.text)
\ No newline at end of file
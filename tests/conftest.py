@@ -0,0 +1,6 @@
+""" Lets the tests import the modules at the top of the repository (e.g. import extract). """
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
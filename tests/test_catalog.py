@@ -0,0 +1,29 @@
+""" Tests for the film catalog (see catalog.py). """
+
+from catalog import Catalog
+
+
+def test_histogram_of_unknown_film_is_kept_by_slug(tmp_path):
+    catalog = Catalog(str(tmp_path / "catalog.sqlite3"))
+    catalog.add_film("black-swan", histogram={'5': 10}, histogram_fetched=True)
+    assert catalog.get_histogram("black-swan") == (True, {'5': 10})
+    assert catalog.get_histogram("the-wrestler") == (False, None)
+
+    # Once the film's id is known, its histogram is stored with the rest of the film
+    catalog.add([{'id': 290472, 'slug': 'black-swan', 'name': 'Black Swan'}])
+    catalog.add_film("black-swan", histogram={'5': 11}, histogram_fetched=True)
+    assert catalog.get_histogram("black-swan") == (True, {'5': 11})
+    assert catalog.get(290472)['histogram'] == {'5': 11}
+
+
+def test_unreadable_catalog_is_skipped(tmp_path):
+    """ A catalog which can't be read behaves as if it's empty, so the films are requested instead. """
+    path = tmp_path / "catalog.sqlite3"
+    path.write_text("not a database" * 100)
+    catalog = Catalog(str(path))
+
+    assert catalog.get(290472) is None
+    assert catalog.get_many([290472]) == {}
+    assert catalog.get_histogram("black-swan") == (False, None)
+    catalog.add([{'id': 290472, 'slug': 'black-swan'}])
+    catalog.add_film("black-swan", histogram={'5': 10}, histogram_fetched=True)
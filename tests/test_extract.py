@@ -0,0 +1,93 @@
+"""
+    Checks that every method of LxmlExtractor returns the same results as SoupExtractor,
+    on the synthetic pages used by the benchmarks (see benchmarks/pages.py).
+
+    Usage:
+        python -m pytest tests
+"""
+
+# Imports
+import pytest
+
+# Local Imports
+from benchmarks import pages
+from extract import LxmlExtractor, SoupExtractor
+
+
+FILMS = pages.make_films(120)
+
+## An ordinary film, one with too few ratings for an average, and one with no ratings at all
+RATED_FILM = next(f for f in FILMS if sum(f['histogram']) >= 30)
+OBSCURE_FILM = next(f for f in FILMS if 0 < sum(f['histogram']) < 30)
+UNRATED_FILM = dict(FILMS[0], histogram=[0] * 10)
+
+LIST_DATA = {
+    'list_id': 1234, 'username': 'tester', 'name': 'A "Synthetic" List & More', 'slug': 'a-synthetic-list',
+    'tags': ['horror', '2020'], 'public': True, 'ranked': True, 'description': 'Made up films.'
+}
+UNRANKED_LIST_DATA = dict(LIST_DATA, tags=[], public=False, ranked=False, description='')
+
+RATINGS = {r: [f"user{r}_{i}" for i in range(5)] for r in (10, 9, 7, 2)}
+
+PAGES = {
+    'empty': '',
+    'film': pages.film_page(RATED_FILM),
+    'histogram': pages.rating_histogram(RATED_FILM),
+    'histogram (obscure)': pages.rating_histogram(OBSCURE_FILM),
+    'histogram (unrated)': pages.rating_histogram(UNRATED_FILM),
+    'search': pages.search_page(FILMS[:72], 2880),
+    'search (page 2)': pages.search_page(FILMS[:10], 2880, page_num=2),
+    'watched': pages.watched_page(FILMS[:72], 'tester', 3, 40),
+    'watched (one page)': pages.watched_page(FILMS[:5], 'tester'),
+    'ratings': pages.ratings_page(RATINGS, 1, 10),
+    'list view': pages.list_view_page(LIST_DATA, FILMS[:100], 1, 5),
+    'list view (unranked)': pages.list_view_page(UNRANKED_LIST_DATA, FILMS[:10]),
+    'list view (empty)': pages.list_view_page(UNRANKED_LIST_DATA, []),
+    'list edit': pages.list_edit_page(LIST_DATA, [
+        {'filmId': f['id'], 'review': 'A <note>' if i%5 == 0 else '', 'containsSpoilers': i%10 == 0} for i, f in enumerate(FILMS)
+    ]),
+    'list edit (empty)': pages.list_edit_page(UNRANKED_LIST_DATA, []),
+    'followers': pages.people_page([f"user{i}" for i in range(25)], 1, 3),
+}
+
+## (method, extra arguments, the pages it's run on)
+CASES = [
+    ('posters', (), ['empty', 'search', 'search (page 2)', 'watched', 'list view', 'list view (empty)']),
+    ('num_films', (), ['search']),
+    ('last_page', (), ['empty', 'watched', 'watched (one page)', 'ratings', 'list view', 'followers']),
+    ('rating_histogram', (), ['histogram', 'histogram (obscure)', 'histogram (unrated)']),
+    *[('raters', (rating,), ['empty', 'ratings']) for rating in range(1, 11)],
+    ('people', (), ['empty', 'followers']),
+    ('film_details', (), ['film']),
+    ('list_entries', (), ['list view', 'list view (unranked)', 'list view (empty)']),
+    ('list_view', (), ['list view', 'list view (unranked)', 'list view (empty)']),
+    ('list_edit', (), ['list edit', 'list edit (empty)']),
+]
+
+
+@pytest.mark.parametrize('method, args, page_name', [
+    pytest.param(method, args, page_name, id=f"{method}{list(args) if args else ''}-{page_name}")
+    for method, args, page_names in CASES for page_name in page_names
+])
+def test_backends_are_equivalent(method, args, page_name):
+    page = PAGES[page_name]
+    expected = getattr(SoupExtractor(), method)(page, *args)
+    assert getattr(LxmlExtractor(), method)(page, *args) == expected
+
+
+def extractor_methods(cls):
+    """ The methods which take the text of a page
+    (the static methods are helpers, which take parsed elements). """
+    return {
+        name for name, value in vars(cls).items()
+        if not name.startswith('_') and callable(value) and not isinstance(value, staticmethod)
+    }
+
+
+def test_every_method_is_checked():
+    """ A new extractor method must be added to CASES. """
+    assert extractor_methods(SoupExtractor) == {method for method, _, _ in CASES}
+
+
+def test_backends_have_the_same_methods():
+    assert extractor_methods(LxmlExtractor) == extractor_methods(SoupExtractor)
@@ -0,0 +1,79 @@
+""" Tests that lists loaded again (through the response cache and LetterboxdList.entries_cache)
+match the lists on the (fake) server. """
+
+import os
+import json
+import importlib
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def modules(tmp_path_factory):
+    """ Starts the fake server, and points the session at it.
+    The session reads its details from data/ when it's imported, so it's imported from a temporary directory. """
+    directory = tmp_path_factory.mktemp("letterboxd")
+    os.makedirs(directory / "data" / "cache")
+    for name, content in (('user_details', {'username': 'tester', 'password': 'pw'}), ('user_agent', {'User-Agent': 'pytest'})):
+        with open(directory / "data" / f"{name}.json", 'w') as f:
+            json.dump(content, f)
+
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        from benchmarks.fake_server import start_server
+        session, catalog, list_maker = [importlib.import_module(i) for i in ('session', 'catalog', 'list_maker')]
+        from response_cache import ResponseCache
+
+        server, url = start_server(num_films=300)
+        session.SESSION.MAIN_URL = url
+        session.SESSION.cookie_store = "cache/cookies"
+        session.SESSION.search_options_store = "cache/search_options"
+        session.SESSION.cache = ResponseCache("data/cache/responses.sqlite3")
+        catalog.set_catalog(None)
+        yield session, list_maker, server
+    finally:
+        os.chdir(cwd)
+    server.shutdown()
+
+
+def test_revalidated_list_is_not_cached_empty(modules):
+    """ A 304 to the list's own validators, when the response cache has no copy of the page,
+    mustn't be cached in place of the page. """
+    session, list_maker, server = modules
+    LetterboxdList = list_maker.LetterboxdList
+    expected = server.data.find_list("someone", "revalidated")['entries']
+
+    assert LetterboxdList("Revalidated", "someone").entries == expected
+    session.SESSION.cache.invalidate()
+    assert LetterboxdList("Revalidated", "someone").entries == expected
+    LetterboxdList.entries_cache.clear()
+    assert LetterboxdList("Revalidated", "someone").entries == expected
+
+
+def test_change_to_later_page_is_loaded(modules):
+    """ Without an ETag, a list whose first page is unchanged must still be loaded again
+    if any other page has changed. """
+    session, list_maker, server = modules
+    LetterboxdList = list_maker.LetterboxdList
+    list_data = dict(server.data.find_list("someone", "paged"), entries=[{'filmId': f['id']} for f in server.data.films[:250]])
+    server.data.lists['paged'] = list_data
+    server.data.list_etags = False
+    cache, session.SESSION.cache = session.SESSION.cache, None
+    try:
+        assert LetterboxdList("Paged", "someone").entries == list_data['entries']
+        list_data['entries'] = list_data['entries'][:-1]
+        assert LetterboxdList("Paged", "someone").entries == list_data['entries']
+    finally:
+        server.data.list_etags = True
+        session.SESSION.cache = cache
+
+
+def test_post_clears_entries_cache(modules):
+    session, list_maker, server = modules
+    LetterboxdList = list_maker.LetterboxdList
+    LetterboxdList("Posted", "someone")
+    assert LetterboxdList.entries_cache.get("someone/list/posted/")
+
+    list_maker.MyList.new("Created After", entries=[{'filmId': server.data.films[0]['id']}])
+    assert not len(LetterboxdList.entries_cache)
@@ -6,10 +6,13 @@
 
 # Imports
 import re
+import asyncio
 
 # Local imports
-from session import SESSION, make_soup
+from session import SESSION
+from extract import get_extractor
 from film_info import FilmInfo
+import util
 
 
 class FilmRaters():
@@ -35,7 +38,7 @@ class FilmRaters():
 
         ## Get information about the film's overall rating and ratings spread
         try:
-            film_ratings = FilmInfo(self.film).ratings
+            film_ratings = FilmInfo(self.film, histogram_only=True).ratings
             self.film_ratings = [v for k,v in sorted(film_ratings.items())]
         except:
             raise Exception("Failed to obtain film data for film:", self.film)
@@ -100,10 +103,33 @@ class FilmRaters():
         ratings like 5 or 6. This is because Letterboxd limits the number of pages
         to 10, and you can only sort by highest or lowest.
         In such instances, the function will simply return False. 
+
+        Parameters:
+        - limit (int or None) - the maximum number of users to return
         
         r-type: list (or False, if could not get results)
         """
 
+        ## Edge cases
+        if type(target_rating) is not int or target_rating not in range(1,11):
+            raise ValueError("Rating must be int value within inclusive range 1-10")
+
+        ## Get route to getting results
+        if not self.__get_route(target_rating, self.film_ratings[target_rating-1]):
+            # Could not get any results
+            return False
+        return list(self.iter_users(target_rating, limit))
+
+    def iter_users(self, target_rating=4, limit=None, max_workers=1):
+        """ The generator equivalent of __call__().
+        Yields users as each page arrives, so the results can be used
+        before scraping has finished, and scraping can be stopped early.
+        If there is no route to the results, nothing is yielded.
+
+        Parameters:
+        - max_workers (int) - the number of pages requested at once
+        r-type: generator """
+
         ## Edge cases
         if type(target_rating) is not int or target_rating not in range(1,11):
             raise ValueError("Rating must be int value within inclusive range 1-10")
@@ -112,42 +138,87 @@ class FilmRaters():
 
         ## Get route to getting results
         if not (route := self.__get_route(target_rating, target_rating_count)):
-            # Could not get any results
-            return False
+            return
         sort_by, page_start, page_end = route
 
         ## Begin scraping process
-        users = [] # results list
         if not limit: limit = target_rating_count # loop will break at result limit
         suburl = f"{self.suburl_film}{sort_by}"
-        page_num = page_start
-        while page_num in range(page_start, page_end+1) and len(users) < limit:
 
-            ## Make request to each page
-            full_suburl = f"{suburl}page/{page_num}"
-            request = SESSION.request("GET", full_suburl)
-            soup = make_soup(request)
+        def get_page(page_num):
+            """ Returns the users on a given page. """
+            request = SESSION.request("GET", f"{suburl}page/{page_num}")
+            return self.get_page_of_users(request.text, target_rating)
+
+        num_users = 0
+        pages = util.concurrent_imap(get_page, range(page_start, page_end+1), max_workers)
+        for page_results in pages:
 
             ## Could not find tag associated with target_rating
-            if not (target_rating := soup.find('span', class_=f'rated-large-{target_rating}')):
-                if not users:
+            if page_results is None:
+                if not num_users:
                     # Failed to get any results
                     raise Exception("Could not get results")
                 else:
                     # There is no section for the int(rating) on this page
                     break
-            
-            # Parent tag that contains the information on users listed under each rating
-            rating_group = target_rating.parent.parent
-            page_results = [i.get('href')[1:-1] for i in rating_group.find_all('a', class_='avatar')]
 
+            ## Stop once the limit has been reached
+            for user in page_results[0:limit-num_users]:
+                yield user
+                num_users += 1
+            if num_users >= limit:
+                break
+
+    async def async_call(self, session=None, target_rating=4, limit=None):
+        """ The async equivalent of __call__(). 
+        Since the pages which contain the target_rating are known in advance, they are all
+        requested concurrently.
+
+        Parameters:
+        - session (AsyncLetterboxdSession or None) - if None, a session is created for this call
+        r-type: list (or False, if could not get results) """
+        if session is None:
+            # Imported here so that httpx is only required when using async
+            from async_session import AsyncLetterboxdSession
+            async with AsyncLetterboxdSession() as session:
+                return await self.async_call(session, target_rating, limit)
+
+        ## Edge cases
+        if type(target_rating) is not int or target_rating not in range(1,11):
+            raise ValueError("Rating must be int value within inclusive range 1-10")
+
+        target_rating_count = self.film_ratings[target_rating-1]
+
+        ## Get route to getting results
+        if not (route := self.__get_route(target_rating, target_rating_count)):
+            # Could not get any results
+            return False
+        sort_by, page_start, page_end = route
+
+        suburl = f"{self.suburl_film}{sort_by}"
+        responses = await asyncio.gather(*[
+            session.request("GET", f"{suburl}page/{page_num}")
+            for page_num in range(page_start, page_end+1)
+        ])
+
+        users = []
+        for response in responses:
+            if (page_results := self.get_page_of_users(response.text, target_rating)) is None:
+                if not users:
+                    raise Exception("Could not get results")
+                break
             users += page_results
-            page_num += 1
 
-        ## If list count exceeds limit, remove the extra data
-        if len(users) > limit:
-            return users[0:limit]
-        return users
+        if not limit: limit = target_rating_count
+        return users[0:limit]
+
+    @staticmethod
+    def get_page_of_users(page, target_rating):
+        """ Returns the users on a single page of ratings who've rated the film the target_rating,
+        given the html of the page.
+        r-type: list (or None, if the page has no section for the target_rating) """
+        return get_extractor().raters(page, target_rating)
 
     
 if __name__ == "__main__":
@@ -3,6 +3,14 @@
 """
 
 import json
+import os
+import itertools
+import threading
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Local Imports
+from entry_set import EntrySet
 
 # Lists with common applications
 yes_list = ['y', 'yes', 'yeah', 'confirm']
@@ -17,6 +25,17 @@ def load_json_data(file_name):
         content = json.load(jf)
     return content
 
+def save_json_data(file_name, content):
+    """ Saves content to a json file, in the same data folder that load_json_data() reads from.
+    The file is written to a temporary file first, so that other processes 
+    never read a half-written file. """
+    path = f"data/{file_name}.json"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as jf:
+        json.dump(content, jf)
+    os.replace(temp_path, path)
+
 def yn(msg=None):
     """ While user's response is not in no/yes list, keeps prompting
     if in yes_list -> True
@@ -39,6 +58,65 @@ def replace_dict(a, b):
     changed_keys = set(a.keys()) & set(b.keys())
     return {k:v if k not in changed_keys else b[k] for k,v in a.items()}
 
+def concurrent_imap(func, iterable, max_workers=1):
+    """ Calls func on each item, using up to max_workers threads,
+    and yields the results in the same order as the items.
+    
+    Only a limited number of items are submitted ahead of the result being yielded,
+    so memory stays bounded. If the generator is closed early, pending calls are cancelled. 
+    r-type: generator """
+    if max_workers <= 1:
+        yield from map(func, iterable)
+        return
+
+    items = iter(iterable)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque([executor.submit(func, i) for i in itertools.islice(items, max_workers*2)])
+        try:
+            while pending:
+                result = pending.popleft().result()
+                # Keep the workers busy while the result is being used
+                pending.extend([executor.submit(func, i) for i in itertools.islice(items, 1)])
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+def concurrent_map(func, iterable, max_workers=1):
+    """ Calls func on each item, using up to max_workers threads.
+    The results are returned in the same order as the items. 
+    r-type: list """
+    return list(concurrent_imap(func, iterable, max_workers))
+
+class LRUCache():
+    """ A dict-like cache (safe to use from several threads) which keeps only the max_size most recently used items. """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.__items = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__items)
+
+    def get(self, key, default=None):
+        with self.__lock:
+            if key not in self.__items:
+                return default
+            self.__items.move_to_end(key)
+            return self.__items[key]
+
+    def set(self, key, value):
+        with self.__lock:
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+            while len(self.__items) > self.max_size:
+                self.__items.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__items.clear()
+
 def merge_lists(*args):
     """ Merge two or more lists together. """
     # Edge cases
@@ -55,14 +133,11 @@ def merge_lists(*args):
     return result
 
 def merge_entries(*args):
+    """ Merge two or more lists of entries, keeping only the filmIds (in order, without duplicates). """
     # Edge cases
     if not all([isinstance(i, list) for i in args]):
         raise TypeError("All arguments must be lists")
     if not args:
         raise Exception("No arguments provided")
 
-    results = []
-    [[results.append( {k:v for k,v in entry.items() if k=="filmId"} ) for entry in entries] for entries in args]
-
-    unique_film_ids = set([i['filmId'] for i in results])
-    return [{"filmId": x} for x in unique_film_ids]
+    return EntrySet().union(*args).without_notes().to_list()
@@ -2,18 +2,23 @@
     This module mimics the behaviour of a user browsing through someone's watched films.
     
     You can get the film_ids a user has watched.
-    You could also then use the (TODO) get_film_names() function to get the name of these films.
+    You could also then use list_maker.get_film_names() to get the name of these films.
     
     You can also search by criteria (e.g. films released in 2007 that the user rated 4*)
 """
 
 # Imports
 import re
+import asyncio
+import logging
 import requests
 from types import SimpleNamespace
 
 # Local Imports 
-from session import SESSION, make_soup
+from session import SESSION
+from extract import get_extractor
+from catalog import add_posters_to_catalog
+import util
 
 
 class Watched():
@@ -41,12 +46,15 @@ class Watched():
         """
         self.username = username
 
-    def __call__(self, **kwargs):
+    def __call__(self, max_workers=8, **kwargs):
         """
         Returns a list of film_ids that correspond with the given search parameters.
 
         If not parameters are given, all film_ids in the watched_list will be returned
 
+        The number of pages is read from the first page, so the remaining pages
+        can be requested concurrently, max_workers at a time.
+
         Keyword Arguments:
 
             rated_only(bool)
@@ -103,6 +111,71 @@ class Watched():
         - username/films/ratings/   year(or decade)/2015/genre/horror/on/amazon-gbr/by/rating
         """
 
+        return list(self.iter_film_ids(max_workers, **kwargs))
+
+    def iter_film_ids(self, max_workers=8, **kwargs):
+        """ The generator equivalent of __call__(), which accepts the same keyword arguments.
+        Yields the film_ids as each page arrives, so the results can be used
+        before the search has finished, and the search can be stopped early. 
+        r-type: generator """
+        requests_jar, login_required = self.get_filters_cookie(kwargs)
+
+        # Get the suburl for request
+        suburl = self.build_suburl(**kwargs)
+
+        def get_page(page_num):
+            """ Returns the html for a given page of the search. """
+            logging.debug(f"Requesting page {page_num} of {suburl}")
+            request = SESSION.request("GET", suburl + f"page/{page_num}/", login_required=login_required, cookies=requests_jar)
+            return request.text
+
+        # The first page tells us how many pages there are
+        page = get_page(1)
+        yield from self.get_page_of_film_ids(page)
+        last_page = get_extractor().last_page(page)
+
+        # So the rest can be requested at once, max_workers at a time
+        pages = util.concurrent_imap(lambda x: self.get_page_of_film_ids(get_page(x)), range(2, last_page+1), max_workers)
+        for page in pages:
+            yield from page
+
+    async def async_call(self, session=None, **kwargs):
+        """
+        The async equivalent of __call__(), which accepts the same keyword arguments.
+        After the first page, the remaining pages are all requested concurrently.
+
+        Parameters:
+        - session (AsyncLetterboxdSession or None) - if None, a session is created for this call
+        """
+        if session is None:
+            # Imported here so that httpx is only required when using async
+            from async_session import AsyncLetterboxdSession
+            async with AsyncLetterboxdSession() as session:
+                return await self.async_call(session, **kwargs)
+
+        requests_jar, login_required = self.get_filters_cookie(kwargs)
+        suburl = self.build_suburl(**kwargs)
+
+        async def get_page(page_num):
+            """ Returns the html for a given page of the search. """
+            response = await session.request("GET", suburl + f"page/{page_num}/", login_required=login_required, cookies=dict(requests_jar))
+            return response.text
+
+        page = await get_page(1)
+        film_ids = self.get_page_of_film_ids(page)
+
+        pages = await asyncio.gather(*[get_page(i) for i in range(2, get_extractor().last_page(page)+1)])
+        for page in pages:
+            film_ids += self.get_page_of_film_ids(page)
+        return film_ids
+
+    def get_filters_cookie(self, kwargs):
+        """ Pops the filters (if any) from the kwargs passed to __call__(),
+        and returns the cookie jar that applies them to a search,
+        along with whether or not a login is required for the search.
+
+        NOTE: filters relate to the session user's activity (e.g. hide-liked), so require a login.
+        r-type: tuple (RequestsCookieJar, bool) """
         # Get valid filters for the request
         if 'filters' in kwargs:
             filters = self.get_valid_filters(kwargs.pop('filters'))
@@ -112,28 +185,15 @@ class Watched():
         # Set cookie according to filters
         requests_jar = requests.cookies.RequestsCookieJar()
         requests_jar.set('filmFilter', filters)
+        return requests_jar, bool(filters)
 
-        # Get the suburl for request
-        suburl = self.build_suburl(**kwargs)
-        
-        film_ids = []
-        page_num = 1
-        while len(film_ids) % 18 == 0:
-            print("page", page_num)
-            request = SESSION.request("GET", suburl + f"page/{page_num}/", cookies=requests_jar)
-            soup = make_soup(request)
-
-            films_on_page = [i.find('div').get('data-film-id') for i in soup.find_all('li', class_='poster-container')]
-
-            """ Edge case: the last page has exactly 18 films.
-            The scraper goes to the next page which is blank, 
-            This means that the films_on_page list is empty, so can use this to break from the loop. """
-            if not films_on_page:
-                break
-
-            film_ids += films_on_page
-            page_num += 1
-        return film_ids
+    @staticmethod
+    def get_page_of_film_ids(page):
+        """ Returns the film_ids on a single page of the search, given its html.
+        r-type: list of str """
+        posters = get_extractor().posters(page)
+        add_posters_to_catalog(posters)
+        return [i['id'] for i in posters]
 
     def build_suburl(self, **kwargs):
         """ Returns a suburl passed on the suburl parameters passed to __call__(). """